@@ -0,0 +1,328 @@
+"""
+Bulk export of positions as NumPy tensors, plus a batched material/mobility evaluator.
+
+Each position becomes
+    planes   uint8 (12, 8, 8)  one plane per piece "PNBRQKpnbrqk", [rank][file], rank 0 = rank 1
+    features uint8 (13,)       side to move (1 = White), castling K Q k q, en passant file one-hot (8)
+
+Positions are encoded in vectorized chunks and written to memory-mapped .npy shards,
+so memory use is bounded by the chunk size, not by the size of the dataset.
+Needs numpy (pip install numpy); the GUI itself does not.
+
+    python board_tensor.py export games.txt dataset/    games saved with the GUI's "Save Game"
+    python board_tensor.py eval dataset/
+    python board_tensor.py bench --positions 200000
+"""
+import argparse
+import glob
+import os
+import random
+import time
+
+import numpy as np
+
+from chess_rules import CASTLING_LETTERS, ChessRules, parse_move
+
+PIECES = "PNBRQKpnbrqk"
+NUM_FEATURES = 13
+
+# ASCII code -> plane index, -1 for empty squares
+PLANE_OF = np.full(256, -1, dtype=np.int8)
+for _i, _p in enumerate(PIECES):
+    PLANE_OF[ord(_p)] = _i
+
+# Material in centipawns per plane, White positive
+PLANE_VALUES = np.array([100, 300, 300, 500, 900, 0, -100, -300, -300, -500, -900, 0], dtype=np.int32)
+MOBILITY_WEIGHT = 5  # centipawns per pseudo-legal move
+
+KNIGHT_STEPS = ((2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1))
+KING_STEPS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+ROOK_DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+BISHOP_DIRS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def position_key(rules):
+    """Compact, numpy-friendly snapshot: (64-char board, "W"/"B", castling bits, en passant file or -1)."""
+    board = "".join(piece or "." for row in rules.board for piece in row)
+    ep = rules.en_passant_target[1] if rules.en_passant_target else -1
+    return board, rules.turn, rules.castling_bits(), ep
+
+
+def iter_game_positions(line):
+    """
+    Yields position_key for every position of one saved game:
+    "fen <FEN> moves e2e4 e7e5 ..." or "startpos moves ...".
+    """
+    tokens = line.split()
+    rules = ChessRules()
+    moves_at = tokens.index("moves") if "moves" in tokens else len(tokens)
+    if tokens and tokens[0] == "fen":
+        rules.set_fen(" ".join(tokens[1:moves_at]))
+    yield position_key(rules)
+    for text in tokens[moves_at + 1:]:
+        fr, fc, tr, tc = parse_move(text)
+        piece = rules.board[fr][fc]
+        if not piece or not rules.validate_move(piece, fr, fc, tr, tc):
+            raise ValueError(f"illegal move in saved game: {text}")
+        rules.make_move(fr, fc, tr, tc)
+        yield position_key(rules)
+
+
+def encode_chunk(keys):
+    """Encodes a list of position keys into (planes, features) arrays in one vectorized pass."""
+    n = len(keys)
+    boards, turns, castling, ep = zip(*keys)
+    codes = np.frombuffer("".join(boards).encode("ascii"), dtype=np.uint8).reshape(n, 64)
+    plane = PLANE_OF[codes]
+    pos, square = np.nonzero(plane >= 0)
+    planes = np.zeros((n, 12, 64), dtype=np.uint8)
+    planes[pos, plane[pos, square], square] = 1
+
+    features = np.zeros((n, NUM_FEATURES), dtype=np.uint8)
+    features[:, 0] = np.array(turns) == "W"
+    bits = np.array(castling, dtype=np.uint8)
+    features[:, 1:5] = (bits[:, None] >> np.arange(len(CASTLING_LETTERS), dtype=np.uint8)) & 1
+    ep = np.array(ep, dtype=np.int8)
+    has_ep = ep >= 0
+    features[np.nonzero(has_ep)[0], 5 + ep[has_ep]] = 1
+    return planes.reshape(n, 12, 8, 8), features
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ShardWriter:
+    """Appends encoded chunks to numbered memory-mapped planes_*.npy / features_*.npy shards."""
+
+    def __init__(self, out_dir, shard_size=65536):
+        self.out_dir = out_dir
+        self.shard_size = shard_size
+        self.shard = -1
+        self.filled = 0
+        self.planes = None
+        self.features = None
+        self.paths = []
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _path(self, kind, shard):
+        return os.path.join(self.out_dir, f"{kind}_{shard:05d}.npy")
+
+    def _open_next(self):
+        self._close_current()
+        self.shard += 1
+        self.filled = 0
+        self.planes = np.lib.format.open_memmap(self._path("planes", self.shard), mode="w+",
+                                                dtype=np.uint8, shape=(self.shard_size, 12, 8, 8))
+        self.features = np.lib.format.open_memmap(self._path("features", self.shard), mode="w+",
+                                                  dtype=np.uint8, shape=(self.shard_size, NUM_FEATURES))
+
+    def _close_current(self):
+        if self.planes is None:
+            return
+        planes_path = self._path("planes", self.shard)
+        features_path = self._path("features", self.shard)
+        if self.filled < self.shard_size:
+            # Last shard: rewrite it at its real length (at most one shard is copied)
+            trimmed = ((planes_path, np.array(self.planes[:self.filled])),
+                       (features_path, np.array(self.features[:self.filled])))
+            self.planes = self.features = None  # unmap before overwriting
+            for path, data in trimmed:
+                np.save(path, data)
+        else:
+            self.planes.flush()
+            self.features.flush()
+            self.planes = self.features = None
+        self.paths.append((planes_path, features_path))
+
+    def write(self, planes, features):
+        start = 0
+        while start < len(planes):
+            if self.planes is None or self.filled == self.shard_size:
+                self._open_next()
+            count = min(len(planes) - start, self.shard_size - self.filled)
+            self.planes[self.filled:self.filled + count] = planes[start:start + count]
+            self.features[self.filled:self.filled + count] = features[start:start + count]
+            self.filled += count
+            start += count
+
+    def close(self):
+        self._close_current()
+        return self.paths
+
+
+def write_dataset(keys, out_dir, chunk_size=4096, shard_size=65536):
+    """Encodes a stream of position keys into shards. Returns [(planes_path, features_path), ...]."""
+    writer = ShardWriter(out_dir, shard_size)
+    for chunk in chunked(keys, chunk_size):
+        writer.write(*encode_chunk(chunk))
+    return writer.close()
+
+
+def _shift(a, dr, dc):
+    """Shifts (n, 8, 8) boards by (dr, dc) squares, filling with zeros."""
+    out = np.zeros_like(a)
+    src_r = slice(max(0, -dr), 8 - max(0, dr))
+    dst_r = slice(max(0, dr), 8 - max(0, -dr))
+    src_c = slice(max(0, -dc), 8 - max(0, dc))
+    dst_c = slice(max(0, dc), 8 - max(0, -dc))
+    out[:, dst_r, dst_c] = a[:, src_r, src_c]
+    return out
+
+
+def _mobility(pieces, own_free, opp, steps=None, dirs=None):
+    """Pseudo-legal move count per position for the pieces in `pieces` (n, 8, 8 counts)."""
+    total = np.zeros(len(pieces), dtype=np.int32)
+    for dr, dc in steps or ():
+        total += (_shift(pieces, dr, dc) * own_free).sum(axis=(1, 2), dtype=np.int32)
+    for dr, dc in dirs or ():
+        ray = pieces
+        for _ in range(7):
+            ray = _shift(ray, dr, dc) * own_free  # blocked by own pieces
+            if not ray.any():
+                break
+            total += ray.sum(axis=(1, 2), dtype=np.int32)
+            ray = ray * (1 - opp)  # a capture ends the ray
+    return total
+
+
+def mobility(planes):
+    """Pseudo-legal knight/bishop/rook/queen/king moves (pins and checks ignored), White minus Black."""
+    # uint8 throughout: a square never holds more than the 10 possible queens/rooks
+    planes = planes.astype(np.uint8, copy=False)
+    white = planes[:, :6].sum(axis=1, dtype=np.uint8)
+    black = planes[:, 6:].sum(axis=1, dtype=np.uint8)
+    score = np.zeros(len(planes), dtype=np.int32)
+    for sign, side, own, opp in ((1, 0, white, black), (-1, 6, black, white)):
+        free = 1 - own
+        n, b, r, q, k = (planes[:, side + i] for i in range(1, 6))
+        moves = (_mobility(n, free, opp, steps=KNIGHT_STEPS)
+                 + _mobility(k, free, opp, steps=KING_STEPS)
+                 + _mobility(b + q, free, opp, dirs=BISHOP_DIRS)
+                 + _mobility(r + q, free, opp, dirs=ROOK_DIRS))
+        score += sign * moves
+    return score
+
+
+def evaluate_batch(planes):
+    """
+    Static evaluation of a batch of (n, 12, 8, 8) planes in centipawns, White's point of view.
+    Returns (material, mobility difference, total score) as int32 arrays.
+    """
+    material = planes.sum(axis=(2, 3), dtype=np.int32) @ PLANE_VALUES
+    mob = mobility(planes)
+    return material, mob, material + MOBILITY_WEIGHT * mob
+
+
+def evaluate_shards(out_dir, chunk_size=4096):
+    """Evaluates every planes_*.npy shard in out_dir chunk by chunk (memory-mapped, bounded memory)."""
+    scores = []
+    for path in sorted(glob.glob(os.path.join(out_dir, "planes_*.npy"))):
+        planes = np.load(path, mmap_mode="r")
+        for start in range(0, len(planes), chunk_size):
+            scores.append(evaluate_batch(np.asarray(planes[start:start + chunk_size]))[2])
+    return np.concatenate(scores) if scores else np.zeros(0, dtype=np.int32)
+
+
+def random_positions(count, seed=None, max_plies=60):
+    """Position keys from random legal games (for benchmarks)."""
+    rng = random.Random(seed)
+    keys = []
+    while len(keys) < count:
+        rules = ChessRules()
+        for _ in range(max_plies):
+            moves = rules.get_all_valid_moves(rules.turn)
+            if not moves:
+                break
+            (fr, fc), (tr, tc) = rng.choice(moves)
+            rules.make_move(fr, fc, tr, tc)
+            keys.append(position_key(rules))
+    return keys[:count]
+
+
+def bench(args):
+    import itertools
+    import shutil
+    import tempfile
+
+    # Random games are slow to generate with the rules code, so a pool is reused;
+    # encoding and evaluation cost does not depend on positions being distinct.
+    pool = random_positions(min(args.pool, args.positions), seed=args.seed)
+    keys = itertools.islice(itertools.cycle(pool), args.positions)
+
+    out_dir = tempfile.mkdtemp(prefix="board_tensor_")
+    try:
+        # Encode and write one chunk at a time, as write_dataset does, timing the two apart
+        encode_s = write_s = 0.0
+        n = 0
+        writer = ShardWriter(out_dir, args.shard)
+        for chunk in chunked(keys, args.chunk):
+            start = time.perf_counter()
+            planes, features = encode_chunk(chunk)
+            mid = time.perf_counter()
+            writer.write(planes, features)
+            encode_s += mid - start
+            write_s += time.perf_counter() - mid
+            n += len(chunk)
+        start = time.perf_counter()
+        writer.close()
+        write_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        scores = evaluate_shards(out_dir, args.chunk)
+        eval_s = time.perf_counter() - start
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    print(f"positions:  {n} (chunk {args.chunk}, shard {args.shard})")
+    print(f"encode:     {n / encode_s:>12,.0f} positions/s")
+    print(f"write:      {n / write_s:>12,.0f} positions/s")
+    print(f"evaluate:   {n / eval_s:>12,.0f} positions/s  (mean score {scores.mean():.1f} cp)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Board tensor export and batched evaluation")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="encode saved games into .npy shards")
+    export.add_argument("games", help="file with one saved game per line")
+    export.add_argument("out_dir")
+    export.add_argument("--chunk", type=int, default=4096)
+    export.add_argument("--shard", type=int, default=65536)
+
+    evaluate = sub.add_parser("eval", help="evaluate all shards in a directory")
+    evaluate.add_argument("out_dir")
+    evaluate.add_argument("--chunk", type=int, default=4096)
+
+    benchmark = sub.add_parser("bench", help="throughput benchmark")
+    benchmark.add_argument("--positions", type=int, default=200000)
+    benchmark.add_argument("--pool", type=int, default=2000, help="distinct random positions to generate")
+    benchmark.add_argument("--chunk", type=int, default=4096)
+    benchmark.add_argument("--shard", type=int, default=65536)
+    benchmark.add_argument("--seed", type=int, default=None)
+
+    args = parser.parse_args()
+    if args.command == "export":
+        def keys():
+            with open(args.games) as f:
+                for line in f:
+                    if line.strip():
+                        yield from iter_game_positions(line)
+        for planes_path, features_path in write_dataset(keys(), args.out_dir, args.chunk, args.shard):
+            print(planes_path, features_path)
+    elif args.command == "eval":
+        scores = evaluate_shards(args.out_dir, args.chunk)
+        print(f"{len(scores)} positions, mean {scores.mean() if len(scores) else 0:.1f} cp")
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
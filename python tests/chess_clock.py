@@ -0,0 +1,101 @@
+import time
+
+
+class ChessClock:
+    """
+    Two-sided game clock driven by time.monotonic().
+    Time is charged exactly when a side presses the clock, so nothing depends on
+    how often (or how late) the GUI redraws.
+
+    mode:
+        "increment" - Fischer increment: `bonus` seconds are added after each move.
+        "delay"     - Simple (US) delay: the first `bonus` seconds of each turn are free.
+    """
+
+    def __init__(self, initial, bonus=0, mode="increment", time_source=time.monotonic):
+        self.initial = float(initial)
+        self.bonus = float(bonus)
+        self.mode = mode
+        self.time_source = time_source
+        self.remaining = {"W": self.initial, "B": self.initial}
+        self.active = None  # "W", "B" or None when stopped
+        self.turn_started = None
+
+    def _spent(self, now):
+        """Seconds the active side has used this turn, after delay is taken off."""
+        elapsed = now - self.turn_started
+        if self.mode == "delay":
+            elapsed = max(0.0, elapsed - self.bonus)
+        return elapsed
+
+    def start(self, color):
+        """Starts the clock for the given color (does nothing if already running)."""
+        if self.active is None:
+            self.active = color
+            self.turn_started = self.time_source()
+
+    def stop(self):
+        """Charges the running side and stops the clock."""
+        if self.active is None:
+            return
+        now = self.time_source()
+        self.remaining[self.active] -= self._spent(now)
+        self.active = None
+        self.turn_started = None
+
+    def press(self, color):
+        """
+        Called when `color` completes a move: charges the elapsed time, applies the
+        increment and starts the opponent's clock.
+        """
+        now = self.time_source()
+        if self.active == color:
+            self.remaining[color] -= self._spent(now)
+        if self.mode == "increment" and self.remaining[color] > 0:
+            self.remaining[color] += self.bonus
+        self.active = "B" if color == "W" else "W"
+        self.turn_started = now
+
+    def snapshot(self):
+        """Banked time of both sides (the running turn not included)."""
+        return (self.remaining["W"], self.remaining["B"])
+
+    def restore(self, snapshot, color):
+        """Puts back a snapshot() and restarts the clock for `color` (used by takebacks)."""
+        self.remaining = {"W": snapshot[0], "B": snapshot[1]}
+        self.active = color
+        self.turn_started = self.time_source()
+
+    def time_left(self, color):
+        """Remaining seconds for `color`, including the turn currently running."""
+        left = self.remaining[color]
+        if self.active == color:
+            left -= self._spent(self.time_source())
+        return max(0.0, left)
+
+    def flagged(self):
+        """Returns the color whose time has run out, or None."""
+        if self.active is not None and self.time_left(self.active) <= 0:
+            return self.active
+        return None
+
+    def next_redraw_ms(self):
+        """
+        Milliseconds until the display next needs refreshing: every 100 ms in the
+        last ten seconds (tenths are shown), otherwise on the next whole second.
+        In delay mode the clock stands still until the delay is used up, so that
+        is waited out first.
+        """
+        if self.active is None:
+            return None
+        now = self.time_source()
+        wait = 0.0
+        if self.mode == "delay":
+            wait = max(0.0, self.bonus - (now - self.turn_started))
+        left = max(0.0, self.remaining[self.active] - self._spent(now))
+        if left < 10:
+            wait += 0.1
+        else:
+            fraction = left - int(left)
+            wait += fraction if fraction > 0 else 1.0
+        return max(20, int(wait * 1000) + 1)
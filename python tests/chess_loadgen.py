@@ -0,0 +1,86 @@
+"""
+Load generator for chess_server.py.
+
+Plays random legal games over many concurrent connections and reports moves/sec
+and move latency percentiles (time from sending a "move" request to its response).
+
+    python chess_server.py &
+    python chess_loadgen.py --games 1000 --connections 50 --plies 40
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from profiler import percentile
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, **request):
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error"))
+        return response
+
+
+async def play_games(host, port, games, args, latencies, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    conn = Connection(reader, writer)
+    try:
+        while games:
+            games.pop()
+            game = (await conn.request(op="new", time=args.time, bonus=args.bonus))["game"]
+            for _ in range(args.plies):
+                moves = (await conn.request(op="moves", game=game))["moves"]
+                if not moves:
+                    break
+                start = time.perf_counter()
+                reply = await conn.request(op="move", game=game, move=rng.choice(moves))
+                latencies.append(time.perf_counter() - start)
+                if reply["result"]:
+                    break
+            await conn.request(op="close", game=game)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    games = list(range(args.games))  # shared work queue
+    latencies = []
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(play_games(args.host, args.port, games, args, latencies, rng)
+                           for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"games:        {args.games} over {args.connections} connections")
+    print(f"moves:        {len(latencies)} in {elapsed:.2f} s")
+    print(f"moves/sec:    {len(latencies) / elapsed:.1f}")
+    print(f"latency p50:  {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"latency p99:  {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"latency max:  {(latencies[-1] if latencies else 0) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for chess_server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--plies", type=int, default=40, help="maximum plies per game")
+    parser.add_argument("--time", type=int, default=None, help="seconds per side (default unlimited)")
+    parser.add_argument("--bonus", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
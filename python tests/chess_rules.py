@@ -0,0 +1,509 @@
+FILES = "abcdefgh"
+
+
+def square_name(row, col):
+    """(0, 4) -> "e1"."""
+    return f"{FILES[col]}{row + 1}"
+
+
+def parse_square(name):
+    """"e1" -> (0, 4). Raises ValueError for anything that is not a square."""
+    if len(name) != 2 or name[0] not in FILES or name[1] not in "12345678":
+        raise ValueError(f"not a square: {name!r}")
+    return int(name[1]) - 1, FILES.index(name[0])
+
+
+def parse_move(text):
+    """
+    Coordinate notation "e2e4" (or "e7e8q") -> (fr, fc, tr, tc).
+    A promotion letter is accepted but ignored; pawns always promote to a queen.
+    """
+    if len(text) not in (4, 5):
+        raise ValueError(f"not a move: {text!r}")
+    fr, fc = parse_square(text[:2])
+    tr, tc = parse_square(text[2:4])
+    return fr, fc, tr, tc
+
+
+def move_name(fr, fc, tr, tc, piece=None):
+    """(1, 4, 3, 4) -> "e2e4". Passing the moving piece adds the "q" of a pawn promotion."""
+    name = square_name(fr, fc) + square_name(tr, tc)
+    if piece is not None and piece.upper() == "P" and tr in (0, 7):
+        name += "q"
+    return name
+
+
+# FEN castling letters in FEN order
+CASTLING_LETTERS = (("W", "kingside", "K"), ("W", "queenside", "Q"), ("B", "kingside", "k"), ("B", "queenside", "q"))
+
+
+class UndoRecord:
+    """What make_move needs to take a move back without keeping a board snapshot."""
+    __slots__ = ("fr", "fc", "tr", "tc", "piece", "captured", "cap_row", "castling", "en_passant", "halfmove", "clock", "clock_after")
+
+    def __init__(self, fr, fc, tr, tc, piece, captured, cap_row, castling, en_passant, halfmove):
+        self.fr, self.fc, self.tr, self.tc = fr, fc, tr, tc
+        self.piece = piece  # the piece as it moved (a pawn, even if it promoted)
+        self.captured = captured
+        self.cap_row = cap_row  # differs from tr for en passant
+        self.castling = castling  # castling rights before the move, see castling_bits
+        self.en_passant = en_passant
+        self.halfmove = halfmove
+        self.clock = None  # callers may keep clock state here: before the move
+        self.clock_after = None  # ... and right after it
+
+    def name(self):
+        return move_name(self.fr, self.fc, self.tr, self.tc, self.piece)
+
+
+class ChessRules:
+    """
+    Board state and move rules without any GUI. ChessGUI builds on this class and
+    the game server runs one instance per game, so keep per-instance state small.
+    Board rows are ranks (row 0 = rank 1, White's side), columns are files a-h.
+    """
+    __slots__ = ("board", "turn", "castling_rights", "en_passant_target", "halfmove_clock", "fullmove_number")
+
+    def __init__(self):
+        self.turn = "W"
+        self.castling_rights = {
+            "W": {"kingside": True, "queenside": True},
+            "B": {"kingside": True, "queenside": True}
+        }
+        self.en_passant_target = None
+        self.halfmove_clock = 0  # plies since the last capture or pawn move
+        self.fullmove_number = 1
+        self.setup_board()
+
+    def to_fen(self):
+        """Returns the position in Forsyth-Edwards Notation."""
+        ranks = []
+        for r in range(7, -1, -1):
+            rank = ""
+            empty = 0
+            for c in range(8):
+                piece = self.board[r][c]
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                rank += piece
+            if empty:
+                rank += str(empty)
+            ranks.append(rank)
+        castling = "".join(letter for color, side, letter in CASTLING_LETTERS
+                           if self.castling_rights[color][side]) or "-"
+        ep = square_name(*self.en_passant_target) if self.en_passant_target else "-"
+        return f"{'/'.join(ranks)} {self.turn.lower()} {castling} {ep} {self.halfmove_clock} {self.fullmove_number}"
+
+    def set_fen(self, fen):
+        """Loads a FEN position. Raises ValueError if it cannot be parsed."""
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError(f"not a FEN: {fen!r}")
+        ranks = fields[0].split("/")
+        if len(ranks) != 8:
+            raise ValueError(f"not a FEN: {fen!r}")
+        board = [[None] * 8 for _ in range(8)]
+        for i, rank in enumerate(ranks):
+            c = 0
+            for ch in rank:
+                if ch.isdigit():
+                    c += int(ch)
+                elif ch.upper() in "KQRBNP" and c < 8:
+                    board[7 - i][c] = ch
+                    c += 1
+                else:
+                    raise ValueError(f"bad rank in FEN: {rank!r}")
+            if c != 8:
+                raise ValueError(f"bad rank in FEN: {rank!r}")
+        if fields[1] not in ("w", "b"):
+            raise ValueError(f"bad side to move in FEN: {fields[1]!r}")
+        self.board = board
+        self.turn = fields[1].upper()
+        for color, side, letter in CASTLING_LETTERS:
+            self.castling_rights[color][side] = letter in fields[2]
+        self.en_passant_target = None if fields[3] == "-" else parse_square(fields[3])
+        self.halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        self.fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+
+    def copy(self):
+        """Independent ChessRules with the same position (never a GUI)."""
+        other = ChessRules.__new__(ChessRules)
+        other.board = [row[:] for row in self.board]
+        other.turn = self.turn
+        other.castling_rights = {color: dict(sides) for color, sides in self.castling_rights.items()}
+        other.en_passant_target = self.en_passant_target
+        other.halfmove_clock = self.halfmove_clock
+        other.fullmove_number = self.fullmove_number
+        return other
+
+    def setup_board(self):
+        self.board = [[None for _ in range(8)] for _ in range(8)]
+        # White pieces
+        self.board[0][0] = self.board[0][7] = "R"
+        self.board[0][1] = self.board[0][6] = "N"
+        self.board[0][2] = self.board[0][5] = "B"
+        self.board[0][3] = "Q"
+        self.board[0][4] = "K"
+        for i in range(8):
+            self.board[1][i] = "P"
+        # Black pieces
+        self.board[7][0] = self.board[7][7] = "r"
+        self.board[7][1] = self.board[7][6] = "n"
+        self.board[7][2] = self.board[7][5] = "b"
+        self.board[7][3] = "q"
+        self.board[7][4] = "k"
+        for i in range(8):
+            self.board[6][i] = "p"
+    
+    def is_same_color(self, piece1, piece2):
+        """Returns True if both pieces are of the same color."""
+        return (piece1.isupper() and piece2.isupper()) or (piece1.islower() and piece2.islower())
+
+    def clear_path(self, fr, fc, tr, tc, board=None):
+        """Verifies that the path is clear from (fr,fc) to (tr,tc) for sliding pieces.
+           Uses provided board or self.board if None."""
+        if board is None:
+            board = self.board
+        d_row = tr - fr
+        d_col = tc - fc
+        step_row = (d_row // abs(d_row)) if d_row != 0 else 0
+        step_col = (d_col // abs(d_col)) if d_col != 0 else 0
+        r, c = fr + step_row, fc + step_col
+        while (r, c) != (tr, tc):
+            if board[r][c]:
+                return False
+            r += step_row
+            c += step_col
+        return True
+
+    def find_king(self, board, color):
+        """Finds the king of the specified color on a given board state."""
+        king_symbol = "K" if color == "W" else "k"
+        for r in range(8):
+            for c in range(8):
+                if board[r][c] == king_symbol:
+                    return (r, c)
+        return None
+
+    def is_in_check_board(self, board, color):
+        """
+        Returns True if the king of the given color is under attack in the provided board.
+        Uses the basic_validate move rule for opposing pieces.
+        """
+        king_pos = self.find_king(board, color)
+        if not king_pos:
+            return True  # Should not happen; treat as check.
+        kr, kc = king_pos
+        opp_color = "B" if color == "W" else "W"
+        for r in range(8):
+            for c in range(8):
+                opp = board[r][c]
+                if opp and ((opp.isupper() and opp_color == "W") or (opp.islower() and opp_color == "B")):
+                    if self.basic_validate(opp, r, c, kr, kc, board, check_king_safety=False):
+                        return True
+        return False
+
+    def basic_validate(self, piece, fr, fc, tr, tc, board, check_king_safety=True):
+        """
+        Checks if a move follows piece-specific rules (ignoring overall king safety, unless specified).
+        Works on the provided board state.
+        """
+        if (fr, fc) == (tr, tc):
+            return False
+        dest_piece = board[tr][tc]
+        if dest_piece and ((piece.isupper() and dest_piece.isupper()) or (piece.islower() and dest_piece.islower())):
+            return False
+        direction = 1 if piece.isupper() else -1
+        piece_type = piece.upper()
+        dr = tr - fr
+        dc = tc - fc
+
+        # Pawn moves and captures.
+        if piece_type == "P":
+            # Move forward.
+            if dc == 0:
+                if dr == direction and dest_piece is None:
+                    return True
+                start_row = 1 if piece.isupper() else 6
+                if fr == start_row and dr == 2 * direction:
+                    if dest_piece is None and board[fr + direction][fc] is None:
+                        return True
+            if abs(dc) == 1 and dr == direction:
+                # Normal diagonal capture.
+                if dest_piece and not self.is_same_color(piece, dest_piece):
+                    return True
+                # En passant.
+                if dest_piece is None and self.en_passant_target == (tr, tc):
+                    return True
+            return False
+
+        # Knight moves.
+        elif piece_type == "N":
+            return (abs(dr), abs(dc)) in [(2, 1), (1, 2)]
+
+        # Bishop moves.
+        elif piece_type == "B":
+            if abs(dr) == abs(dc):
+                return self.clear_path(fr, fc, tr, tc, board)
+            return False
+
+        # Rook moves.
+        elif piece_type == "R":
+            if dr == 0 or dc == 0:
+                return self.clear_path(fr, fc, tr, tc, board)
+            return False
+        # Queen moves.
+        elif piece_type == "Q":
+            if abs(dr) == abs(dc) or dr == 0 or dc == 0:
+                return self.clear_path(fr, fc, tr, tc, board)
+            return False
+
+        # King moves.
+        elif piece_type == "K":
+            if max(abs(dr), abs(dc)) == 1:
+                return True
+            # Castling: King moving two squares horizontally.
+            if dr == 0 and abs(dc) == 2:
+                # Do not castle if the king is in check.
+                if check_king_safety and self.is_in_check_board(self.board, "W" if piece.isupper() else "B"):
+                    return False
+                color = "W" if piece.isupper() else "B"
+                if dc > 0:
+                    # Kingside castling.
+                    if not self.castling_rights[color]["kingside"]:
+                        return False
+                    rook_col = 7
+                else:
+                    # Queenside castling.
+                    if not self.castling_rights[color]["queenside"]:
+                        return False
+                    rook_col = 0
+                # Rook must be present and unmoved.
+                expected_rook = "R" if color == "W" else "r"
+                if board[fr][rook_col] != expected_rook:
+                    return False
+                # Squares between king and rook must be clear.
+                step = 1 if dc > 0 else -1
+                for c in range(fc + step, rook_col, step):
+                    if board[fr][c]:
+                        return False
+                # The king may not pass through an attacked square.
+                for c in [fc, fc + step, fc + 2 * step]:
+                    temp_board = [row[:] for row in board]
+                    temp_board[fr][fc] = None
+                    temp_board[fr][c] = piece
+                    if self.is_in_check_board(temp_board, color):
+                        return False
+                return True
+
+        return False
+    
+    def get_valid_moves_for_piece(self, fr, fc):
+        piece = self.board[fr][fc]
+        if not piece:
+            return []
+        moves = []
+        for tr in range(8):
+            for tc in range(8):
+                if self.validate_move(piece, fr, fc, tr, tc):
+                    moves.append((tr, tc))
+        return moves
+    def simulate_move(self, fr, fc, tr, tc, extra_updates=None):
+        """
+        Create a copy of the board with a move applied. The extra_updates callback
+        can be used for handling en passant captures or castling rook movement.
+        """
+        new_board = [row[:] for row in self.board]  # squares hold immutable strings
+        piece = new_board[fr][fc]
+        new_board[tr][tc] = piece
+        new_board[fr][fc] = None
+        if extra_updates:
+            extra_updates(new_board)
+        return new_board
+
+    def get_extra_updates(self, piece, fr, fc, tr, tc):
+        """
+        Returns a callback function to update special moves (en passant and castling)
+        on the simulated board.
+        """
+        def update(new_board):
+            # En passant capture.
+            if piece.upper() == "P" and (tr, tc) == self.en_passant_target and self.board[tr][tc] is None:
+                cap_row = tr - (1 if piece.isupper() else -1)
+                new_board[cap_row][tc] = None
+            # Castling: Move the rook.
+            if piece.upper() == "K" and abs(tc - fc) == 2:
+                if tc > fc:
+                    # Kingside castle.
+                    rook_from = (fr, 7)
+                    rook_to = (fr, fc + 1)
+                else:
+                    # Queenside castle.
+                    rook_from = (fr, 0)
+                    rook_to = (fr, fc - 1)
+                new_board[rook_to[0]][rook_to[1]] = new_board[rook_from[0]][rook_from[1]]
+                new_board[rook_from[0]][rook_from[1]] = None
+        return update
+
+    def validate_move(self, piece, fr, fc, tr, tc):
+        """
+        Validates a move by checking piece-specific rules and then simulating the move
+        to verify that the moving side's king is not left in check.
+        """
+        if not self.basic_validate(piece, fr, fc, tr, tc, self.board):
+            return False
+
+        extra = self.get_extra_updates(piece, fr, fc, tr, tc)
+        new_board = self.simulate_move(fr, fc, tr, tc, extra)
+        moving_color = "W" if piece.isupper() else "B"
+        if self.is_in_check_board(new_board, moving_color):
+            return False
+
+        return True
+
+    def make_move(self, fr, fc, tr, tc):
+        """
+        Plays a move that passed validate_move in place: moves the piece (plus the rook
+        or the en passant victim), updates special states and switches the turn.
+        Returns an UndoRecord for unmake_move.
+        """
+        board = self.board
+        piece = board[fr][fc]
+        cap_row = tr
+        captured = board[tr][tc]
+        # En passant capture
+        if captured is None and piece.upper() == "P" and self.en_passant_target == (tr, tc):
+            cap_row = tr - (1 if piece.isupper() else -1)
+            captured = board[cap_row][tc]
+            board[cap_row][tc] = None
+        record = UndoRecord(fr, fc, tr, tc, piece, captured, cap_row, self.castling_bits(),
+                            self.en_passant_target, self.halfmove_clock)
+
+        board[tr][tc] = piece
+        board[fr][fc] = None
+        # Castling: move the rook too
+        if piece.upper() == "K" and abs(tc - fc) == 2:
+            rook_col, rook_to = (7, fc + 1) if tc > fc else (0, fc - 1)
+            board[fr][rook_to] = board[fr][rook_col]
+            board[fr][rook_col] = None
+        self.update_special_states(piece, fr, fc, tr, tc, captured)
+
+        if captured is not None or piece.upper() == "P":
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+        if piece.islower():
+            self.fullmove_number += 1
+        return record
+
+    def unmake_move(self, record):
+        """Takes back the move described by an UndoRecord from make_move (latest move first)."""
+        board = self.board
+        fr, fc, tr, tc, piece = record.fr, record.fc, record.tr, record.tc, record.piece
+        board[fr][fc] = piece  # also undoes a promotion
+        board[tr][tc] = None
+        if record.captured is not None:
+            board[record.cap_row][tc] = record.captured
+        if piece.upper() == "K" and abs(tc - fc) == 2:
+            rook_col, rook_to = (7, fc + 1) if tc > fc else (0, fc - 1)
+            board[fr][rook_col] = board[fr][rook_to]
+            board[fr][rook_to] = None
+        self.set_castling_bits(record.castling)
+        self.en_passant_target = record.en_passant
+        self.halfmove_clock = record.halfmove
+        self.turn = "W" if piece.isupper() else "B"
+        if piece.islower():
+            self.fullmove_number -= 1
+
+    def castling_bits(self):
+        """Castling rights packed into an int (bit order as in CASTLING_LETTERS)."""
+        bits = 0
+        for i, (color, side, _) in enumerate(CASTLING_LETTERS):
+            if self.castling_rights[color][side]:
+                bits |= 1 << i
+        return bits
+
+    def set_castling_bits(self, bits):
+        for i, (color, side, _) in enumerate(CASTLING_LETTERS):
+            self.castling_rights[color][side] = bool(bits & (1 << i))
+
+    def update_special_states(self, piece, fr, fc, tr, tc, captured=None):
+        """
+        Updates castling rights, en passant target, and promotions. Also switches the turn.
+        """
+        color = "W" if piece.isupper() else "B"
+        opponent = "B" if color == "W" else "W"
+        self.en_passant_target = None
+
+        # Pawn double move: set en passant target.
+        if piece.upper() == "P" and abs(tr - fr) == 2:
+            self.en_passant_target = (fr + (1 if piece.isupper() else -1), fc)
+
+        # Promotion: when a pawn reaches the last rank.
+        if piece.upper() == "P":
+            if (piece.isupper() and tr == 7) or (piece.islower() and tr == 0):
+                # Automatically promote to Queen.
+                self.board[tr][tc] = "Q" if piece.isupper() else "q"
+
+        # King move: lose castling rights.
+        if piece.upper() == "K":
+            self.castling_rights[color]["kingside"] = False
+            self.castling_rights[color]["queenside"] = False
+
+        # Rook move: update castling rights if it moves from its starting square.
+        if piece.upper() == "R":
+            if color == "W":
+                if (fr, fc) == (0, 0):
+                    self.castling_rights["W"]["queenside"] = False
+                elif (fr, fc) == (0, 7):
+                    self.castling_rights["W"]["kingside"] = False
+            else:
+                if (fr, fc) == (7, 0):
+                    self.castling_rights["B"]["queenside"] = False
+                elif (fr, fc) == (7, 7):
+                    self.castling_rights["B"]["kingside"] = False
+
+        # If a rook is captured from its starting square, adjust the opponent's castling rights.
+        # `captured` comes from the caller: by now the moving piece stands on (tr, tc).
+        if captured and captured.upper() == "R":
+            if opponent == "W":
+                if (tr, tc) == (0, 0):
+                    self.castling_rights["W"]["queenside"] = False
+                elif (tr, tc) == (0, 7):
+                    self.castling_rights["W"]["kingside"] = False
+            else:
+                if (tr, tc) == (7, 0):
+                    self.castling_rights["B"]["queenside"] = False
+                elif (tr, tc) == (7, 7):
+                    self.castling_rights["B"]["kingside"] = False
+
+        # Switch turn.
+        self.turn = opponent
+
+    def iter_valid_moves(self, color):
+        """
+        Yields the valid moves for the given color one at a time.
+        Each move is represented as ((fr, fc), (tr, tc)).
+        """
+        for r in range(8):
+            for c in range(8):
+                piece = self.board[r][c]
+                if piece:
+                    if (piece.isupper() and color == "W") or (piece.islower() and color == "B"):
+                        for tr in range(8):
+                            for tc in range(8):
+                                if self.validate_move(piece, r, c, tr, tc):
+                                    yield ((r, c), (tr, tc))
+
+    def get_all_valid_moves(self, color):
+        """Returns a list of valid moves for the given color."""
+        return list(self.iter_valid_moves(color))
+
+    def has_valid_moves(self, color):
+        """Returns True if the player of the given color has any valid moves."""
+        # Stops at the first move found instead of generating all of them
+        return next(self.iter_valid_moves(color), None) is not None
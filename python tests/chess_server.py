@@ -0,0 +1,201 @@
+"""
+Asyncio game server: many independent games in one process on the shared ChessRules core.
+
+Protocol: one JSON object per line over TCP, one response line per request.
+A request may carry an "id", which is echoed back so clients can pipeline.
+
+    {"op": "new", "time": 300, "bonus": 2, "mode": "increment"}   time omitted = unlimited
+    {"op": "move", "game": 1, "move": "e2e4"}
+    {"op": "moves", "game": 1}                                      legal moves for the side to move
+    {"op": "state", "game": 1}
+    {"op": "close", "game": 1}
+
+Responses are {"ok": true, ...} or {"ok": false, "error": "..."}.
+A game belongs to the connection that created it: only that connection may
+"move" (for both sides) or "close" it, any connection may read "moves" and
+"state". It is freed when that connection closes, so abandoned games do not
+pile up. There is no other access control: anyone who can connect can play.
+
+    python chess_server.py --port 8765
+"""
+import argparse
+import asyncio
+import json
+
+from chess_clock import ChessClock
+from chess_rules import ChessRules, move_name, parse_move, square_name
+
+
+class GameSession:
+    """One game: the rules state, an optional clock and the result. Flags are checked lazily, so idle games cost no timers."""
+    __slots__ = ("rules", "clock", "result", "plies")
+
+    def __init__(self, time_limit=None, bonus=0, mode="increment"):
+        self.rules = ChessRules()
+        self.clock = None
+        if time_limit:
+            self.clock = ChessClock(time_limit, bonus, mode)
+            self.clock.start("W")
+        self.result = None  # None while the game is running
+        self.plies = 0
+
+    def check_flag(self):
+        if self.result is None and self.clock is not None:
+            loser = self.clock.flagged()
+            if loser is not None:
+                self.clock.stop()
+                self.result = "timeout " + ("1-0" if loser == "B" else "0-1")
+
+    def move(self, text):
+        """Validates and plays a coordinate-notation move. Raises ValueError if it is not allowed."""
+        self.check_flag()
+        if self.result is not None:
+            raise ValueError("game is over")
+        fr, fc, tr, tc = parse_move(text)
+        rules = self.rules
+        piece = rules.board[fr][fc]
+        if not piece or (piece.isupper() != (rules.turn == "W")):
+            raise ValueError("no piece of the side to move on " + text[:2])
+        if not rules.validate_move(piece, fr, fc, tr, tc):
+            raise ValueError("illegal move")
+        if self.clock is not None:
+            self.clock.press(rules.turn)
+        rules.make_move(fr, fc, tr, tc)
+        self.plies += 1
+
+        # Checkmate or stalemate for the side now to move
+        if not rules.has_valid_moves(rules.turn):
+            if self.clock is not None:
+                self.clock.stop()
+            if rules.is_in_check_board(rules.board, rules.turn):
+                self.result = "checkmate " + ("0-1" if rules.turn == "W" else "1-0")
+            else:
+                self.result = "stalemate 1/2-1/2"
+
+    def legal_moves(self):
+        if self.result is not None:
+            return []
+        board = self.rules.board
+        return [move_name(fr, fc, tr, tc, board[fr][fc])
+                for (fr, fc), (tr, tc) in self.rules.iter_valid_moves(self.rules.turn)]
+
+    def state(self):
+        self.check_flag()
+        rules = self.rules
+        ep = rules.en_passant_target
+        return {
+            "board": ["".join(p or "." for p in rules.board[r]) for r in range(7, -1, -1)],
+            "turn": rules.turn,
+            "castling": rules.castling_rights,
+            "en_passant": square_name(*ep) if ep else None,
+            "in_check": rules.is_in_check_board(rules.board, rules.turn),
+            "clock": {c: self.clock.time_left(c) for c in "WB"} if self.clock else None,
+            "plies": self.plies,
+            "result": self.result,
+        }
+
+
+CLOCK_MODES = ("increment", "delay")
+
+
+class GameServer:
+    def __init__(self):
+        self.games = {}
+        self.next_id = 1
+
+    def get_game(self, request):
+        game = self.games.get(request.get("game"))
+        if game is None:
+            raise ValueError("unknown game")
+        return game
+
+    def get_own_game(self, request, owned):
+        """Like get_game, but the game must have been created on this connection (owned=None skips the check)."""
+        game = self.get_game(request)
+        if owned is not None and request.get("game") not in owned:
+            raise ValueError("game belongs to another connection")
+        return game
+
+    def handle(self, request, owned=None):
+        """
+        Runs one request and returns the response dict. `owned` is the set of game ids
+        created on the requesting connection; None (in-process use) allows every game.
+        """
+        op = request.get("op")
+        if op == "new":
+            mode = request.get("mode", "increment")
+            if mode not in CLOCK_MODES:
+                raise ValueError(f"unknown clock mode: {mode!r}")
+            game_id = self.next_id
+            self.next_id += 1
+            self.games[game_id] = GameSession(request.get("time"), request.get("bonus", 0), mode)
+            if owned is not None:
+                owned.add(game_id)
+            return {"ok": True, "game": game_id}
+        if op == "move":
+            game = self.get_own_game(request, owned)
+            game.move(str(request.get("move", "")))
+            return {"ok": True, "result": game.result, "turn": game.rules.turn}
+        if op == "moves":
+            return {"ok": True, "moves": self.get_game(request).legal_moves()}
+        if op == "state":
+            return {"ok": True, "state": self.get_game(request).state()}
+        if op == "close":
+            self.get_own_game(request, owned)
+            del self.games[request["game"]]
+            if owned is not None:
+                owned.discard(request["game"])
+            return {"ok": True}
+        raise ValueError(f"unknown op: {op!r}")
+
+    async def serve_client(self, reader, writer):
+        owned = set()  # games created on this connection
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = {}
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        request = {}
+                        raise ValueError("request must be a JSON object")
+                    response = self.handle(request, owned)
+                except RecursionError:
+                    response = {"ok": False, "error": "request nested too deeply"}
+                except (ValueError, TypeError) as e:  # ValueError includes JSONDecodeError
+                    response = {"ok": False, "error": str(e)}
+                if "id" in request:
+                    response["id"] = request["id"]
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError):
+            pass  # client went away or sent an oversized line
+        finally:
+            for game_id in owned:
+                self.games.pop(game_id, None)
+            writer.close()
+
+
+async def run_server(host, port):
+    game_server = GameServer()
+    server = await asyncio.start_server(game_server.serve_client, host, port, limit=2 ** 16)
+    print(f"Chess server listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio chess game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_server(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,94 @@
+import time
+_MODULE_START = time.monotonic()  # for the startup benchmark
+import argparse
+import json
+import os
 import tkinter as tk
-import pygame
 from tkinter import messagebox
-from PIL import Image, ImageTk  # Pillow library for images
-import copy
 import random
-
-class ChessGUI:
-    def __init__(self, master):
+import shlex
+from chess_clock import ChessClock
+from chess_rules import ChessRules, parse_move
+
+# pygame and Pillow are slow to import and only needed later:
+# pygame when the first sound plays, Pillow when a sprite is not in SPRITE_CACHE yet.
+_mixer = None
+SPRITE_CACHE = "sprite_cache"
+GAMES_FILE = "games.txt"  # one saved game per line, see save_game
+
+# Map pieces to uniquely named image files
+PIECE_TO_FILE = {
+    'K': 'w_king.png',
+    'Q': 'w_queen.png',
+    'R': 'w_rook.png',
+    'B': 'w_bishop.png',
+    'N': 'w_knight.png',
+    'P': 'w_pawn.png',
+    'k': 'b_king.png',
+    'q': 'b_queen.png',
+    'r': 'b_rook.png',
+    'b': 'b_bishop.png',
+    'n': 'b_knight.png',
+    'p': 'b_pawn.png',
+}
+
+
+def get_mixer():
+    """Imports pygame and initialises its mixer on first use."""
+    global _mixer
+    if _mixer is None:
+        import pygame
+        pygame.mixer.init()
+        _mixer = pygame.mixer
+    return _mixer
+
+
+def load_sprite(filename, size):
+    """
+    Returns a PhotoImage of `filename` scaled to size x size. Scaled copies are kept
+    in SPRITE_CACHE so Pillow is only imported the first time a size is used.
+    """
+    cached = os.path.join(SPRITE_CACHE, f"{size}_{filename}")
+    if not os.path.exists(cached):
+        from PIL import Image  # Pillow library for images
+        os.makedirs(SPRITE_CACHE, exist_ok=True)
+        img = Image.open(filename)
+        img = img.resize((size, size), Image.Resampling.LANCZOS)
+        img.save(cached)
+    return tk.PhotoImage(file=cached)
+
+
+class ChessGUI(ChessRules):
+    def __init__(self, master, animation_duration=0.3, profiler=None, show_profile_pane=False):
+        super().__init__()  # board, turn, castling rights, en passant target
         self.time_limit = None  # seconds, None = unlimited
-        self.white_time = None
-        self.black_time = None
-        self.timer_running = False
+        self.clock = None  # ChessClock, None = unlimited
+        self.timer_after_id = None  # the single pending timer redraw
+        self.flag_fallen = False  # the game ended on time and the window is gone
         self.check_sound_played = False
         self.master = master
         self.square_size = 60
         self.animating = False
+        self.animation_duration = animation_duration  # seconds, 0 = no animation
+        self.animation_frame_ms = 15
+        self.premoves = []  # squares clicked while a move was animating
+        self.max_premove_clicks = 2  # one premove: piece + destination
         self.captured_white = []
         self.captured_black = []
         self.colors = ["#F0D9B5", "#B58863"]
         self.selected = None
-        self.turn = "W"
-        self.castling_rights = {
-            "W": {"kingside": True, "queenside": True},
-            "B": {"kingside": True, "queenside": True}
-        }
-        self.en_passant_target = None
         self.soundEffect = "piece_moving.mp3"
+        self.profiler = profiler  # HotPathProfiler, None = no instrumentation
+        self.profile_label = None
+        self.engine = None  # UCIEngine, see attach_engine
+        self.engine_side = None  # "W"/"B" = engine plays that side, None = analysis only
+        self.engine_movetime = 1000  # ms per engine move when there is no clock
+        self.engine_label = None
+        self.start_fen = self.to_fen()
+        self.move_stack = []  # UndoRecords of the moves played since start_fen
+        self.redo_stack = []  # UndoRecords of taken-back moves, next redo last
+        self.clock_before_move = None  # clock snapshot taken when the pending move was made
+        self.clock_after_move = None  # ... and right after the clock was pressed for it
 
         self.master.title("Advanced Chess GUI")
 
@@ -87,92 +150,156 @@ class ChessGUI:
         self.black_timer_label.pack(pady=(5, 15))
         self.restart_button = tk.Button(self.sidebar, text="Restart Game", command=self.restart_game)
         self.restart_button.pack(pady=(10, 20))
-        # Map pieces to uniquely named image files
-        piece_to_file = {
-        'K': 'w_king.png',
-        'Q': 'w_queen.png',
-        'R': 'w_rook.png',
-        'B': 'w_bishop.png',
-        'N': 'w_knight.png',
-        'P': 'w_pawn.png',
-        'k': 'b_king.png',
-        'q': 'b_queen.png',
-        'r': 'b_rook.png',
-        'b': 'b_bishop.png',
-        'n': 'b_knight.png',
-        'p': 'b_pawn.png',
-        }
+
+        # Move list with takeback navigation; click a line to jump to that ply
+        self.moves_frame = tk.Frame(self.sidebar)
+        self.moves_frame.pack(fill="x", padx=5)
+        self.move_listbox = tk.Listbox(self.moves_frame, height=8, exportselection=False, font=("Arial", 10))
+        self.move_scrollbar = tk.Scrollbar(self.moves_frame, command=self.move_listbox.yview)
+        self.move_listbox.config(yscrollcommand=self.move_scrollbar.set)
+        self.move_listbox.pack(side="left", fill="x", expand=True)
+        self.move_scrollbar.pack(side="right", fill="y")
+        self.move_listbox.insert("end", "Start position")
+        self.move_listbox.selection_set(0)
+        self.move_listbox.bind("<<ListboxSelect>>", self.on_move_list_select)
+
+        self.undo_frame = tk.Frame(self.sidebar)
+        self.undo_frame.pack(pady=(5, 15))
+        tk.Button(self.undo_frame, text="Undo", command=self.on_undo).pack(side="left", padx=5)
+        tk.Button(self.undo_frame, text="Redo", command=self.on_redo).pack(side="left", padx=5)
+        tk.Button(self.undo_frame, text="Save Game", command=self.save_game).pack(side="left", padx=5)
+        if self.profiler is not None:
+            self.profiler.attach(self)
+            if show_profile_pane:
+                # Debug pane: per-move counters of the hot paths
+                self.profile_label = tk.Label(self.sidebar, text=self.profiler.report(),
+                                              font=("Courier", 9), justify="left", anchor="w")
+                self.profile_label.pack(fill="x", padx=5)
         self.images = {}
-        for piece, filename in piece_to_file.items():
-            img = Image.open(filename)
-            img = img.resize((self.square_size - 10, self.square_size - 10), Image.Resampling.LANCZOS)
-            self.images[piece] = ImageTk.PhotoImage(img)
+        self.startup_marks = {"module_start": _MODULE_START}
 
-        self.setup_board()
         self.draw_board()
+
+    def show(self, ask_time_control=True):
+        """
+        Paints the window first and only then loads sprites and enables input,
+        so nothing heavy runs before the player sees the board.
+        """
+        self.master.update()
+        self.startup_marks["first_paint"] = time.monotonic()
+        self.load_images()
         self.draw_pieces()
         self.canvas.bind("<Button-1>", self.on_click)
+        self.master.update_idletasks()
+        self.startup_marks["interactive"] = time.monotonic()
+        if ask_time_control:
+            self.time_selection_dialog()
+
+    def load_images(self):
+        size = self.square_size - 10
+        for piece, filename in PIECE_TO_FILE.items():
+            self.images[piece] = load_sprite(filename, size)
+
     def restart_game(self):
         if self.animating:
             return  # Optionally prevent restart during animation
-        if hasattr(self, 'timer_after_id') and self.timer_after_id:
-            self.master.after_cancel(self.timer_after_id)
-            self.timer_after_id = None
+        self.stop_timer()
 
         self.master.destroy()  # Close current chess window
 
         # Create new root and start fresh GUI + time selection
         new_root = tk.Tk()
-        new_app = ChessGUI(new_root)
-        new_app.time_selection_dialog()
+        new_app = ChessGUI(new_root, self.animation_duration, self.profiler, self.profile_label is not None)
+        if self.engine is not None:
+            self.engine.stop()
+            self.engine.new_game()
+            new_app.attach_engine(self.engine, self.engine_side, self.engine_movetime)
+        new_app.show()
         new_root.mainloop()
 
     def format_time(self, seconds):
         if seconds is None:
             return "--:--"
-        m, s = divmod(seconds, 60)
+        if seconds < 10:
+            # Show tenths in time scrambles (truncated, never rounded up)
+            m, s = divmod(int(seconds * 10) / 10, 60)
+            return f"{int(m):02d}:{s:04.1f}"
+        m, s = divmod(int(seconds), 60)
         return f"{m:02d}:{s:02d}"
 
-    def update_timer(self):
-        if not self.timer_running:
-            return
-
-        if self.turn == "W" and self.white_time is not None:
-            self.white_time -= 1
-        elif self.turn == "B" and self.black_time is not None:
-            self.black_time -= 1
-
-        # Update display labels
+    def update_timer_labels(self):
+        white_time = self.clock.time_left("W") if self.clock else None
+        black_time = self.clock.time_left("B") if self.clock else None
+        # The labels swap places with the board flip
         if self.turn == "B":
-            self.white_timer_label.config(text=f"White - {self.player1_name} - Time: {self.format_time(self.white_time)}")
-            self.black_timer_label.config(text=f"Black - {self.player2_name} - Time: {self.format_time(self.black_time)}")
+            self.white_timer_label.config(text=f"White - {self.player1_name} - Time: {self.format_time(white_time)}")
+            self.black_timer_label.config(text=f"Black - {self.player2_name} - Time: {self.format_time(black_time)}")
         else:
-            self.black_timer_label.config(text=f"White - {self.player1_name} - Time: {self.format_time(self.white_time)}")
-            self.white_timer_label.config(text=f"Black - {self.player2_name} - Time: {self.format_time(self.black_time)}")
+            self.black_timer_label.config(text=f"White - {self.player1_name} - Time: {self.format_time(white_time)}")
+            self.white_timer_label.config(text=f"Black - {self.player2_name} - Time: {self.format_time(black_time)}")
+
+    def update_timer(self):
+        """Redraws the clock. Returns True if the game has ended on time (the window is then destroyed)."""
+        self.timer_after_id = None
+        if self.flag_fallen:
+            return True
+        if self.clock is None:
+            return False
+
+        self.update_timer_labels()
 
         # Check for timeout
-        if (self.white_time is not None and self.white_time <= 0):
-            self.soundEffect="checkmate.mp3"
-            self.playSound()
-            self.timer_running = False
-            messagebox.showinfo("Time Out", "White ran out of time! Black wins!")
-            self.master.destroy()
-            return
-        elif (self.black_time is not None and self.black_time <= 0):
+        loser = self.clock.flagged()
+        if loser is not None:
+            self.stop_timer()
             self.soundEffect="checkmate.mp3"
             self.playSound()
-            self.timer_running = False
-            messagebox.showinfo("Time Out", "Black ran out of time! White wins!")
+            if loser == "W":
+                messagebox.showinfo("Time Out", "White ran out of time! Black wins!")
+            else:
+                messagebox.showinfo("Time Out", "Black ran out of time! White wins!")
+            self.flag_fallen = True
             self.master.destroy()
-            return
+            return True
+
+        # Redraw often only when tenths are visible
+        delay = self.clock.next_redraw_ms()
+        if delay is not None:
+            self.timer_after_id = self.master.after(delay, self.update_timer)
+        return False
 
-        # Call this function again after 1 second
-        self.timer_after_id = self.master.after(1000, self.update_timer)
+    def refresh_timer(self):
+        """Redraws the clock now and reschedules the single pending redraw. Returns True if the game ended on time."""
+        if self.timer_after_id:
+            self.master.after_cancel(self.timer_after_id)
+            self.timer_after_id = None
+        return self.update_timer()
 
-    def start_timer(self):
+    def time_ran_out(self):
+        """
+        Ends the game on time if a flag has fallen. Called before accepting a move, since
+        the redraw loop may not have noticed the flag yet. Once it returned True, nothing
+        may touch the (destroyed) window any more.
+        """
+        if self.flag_fallen:
+            return True
+        if self.clock is not None and self.clock.flagged() is not None:
+            self.refresh_timer()  # reports the timeout and closes the game
+            return True
+        return False
+
+    def stop_timer(self):
+        if self.timer_after_id:
+            self.master.after_cancel(self.timer_after_id)
+            self.timer_after_id = None
+        if self.clock is not None:
+            self.clock.stop()
+
+    def start_timer(self, bonus=0, mode="increment"):
         if self.time_limit is not None:
-            self.timer_running = True
-            self.update_timer()
+            self.clock = ChessClock(self.time_limit, bonus, mode)
+            self.clock.start(self.turn)
+            self.refresh_timer()
         else:
             # Unlimited time, no timer countdown
             self.white_timer_label.config(text="White Time: --:--")
@@ -205,6 +332,15 @@ class ChessGUI:
         for label, seconds in times:
             r = tk.Radiobutton(dialog, text=label, variable=self.selected_time, value=seconds if seconds else -1)
             r.pack(fill='x', padx=20, anchor='center')
+        tk.Label(dialog, text="Bonus per move:").pack(pady=(20, 5))
+        bonuses = [("None", 0), ("1 Second", 1), ("2 Seconds", 2), ("3 Seconds", 3), ("5 Seconds", 5), ("10 Seconds", 10)]
+        self.selected_bonus = tk.IntVar(value=0)
+        for label, seconds in bonuses:
+            tk.Radiobutton(dialog, text=label, variable=self.selected_bonus, value=seconds).pack(fill='x', padx=20, anchor='center')
+
+        self.selected_clock_mode = tk.StringVar(value="increment")
+        tk.Radiobutton(dialog, text="Increment (added after each move)", variable=self.selected_clock_mode, value="increment").pack(fill='x', padx=20, anchor='center')
+        tk.Radiobutton(dialog, text="Delay (clock waits before counting down)", variable=self.selected_clock_mode, value="delay").pack(fill='x', padx=20, anchor='center')
         tk.Label(dialog, text="Who should start?").pack(pady=(20, 5))
         self.selected_start = tk.StringVar(value="white")
 
@@ -216,12 +352,6 @@ class ChessGUI:
         def on_confirm():
             val = self.selected_time.get()
             self.time_limit = None if val == -1 else val
-            if self.time_limit:
-                self.white_time = self.time_limit
-                self.black_time = self.time_limit
-            else:
-                self.white_time = None
-                self.black_time = None
             # Store player names
             player1_name_raw = player1_entry.get().strip() or "Player 1"
             player2_name_raw = player2_entry.get().strip() or "Player 2"
@@ -244,8 +374,10 @@ class ChessGUI:
             self.turn = "W"
             self.captured_white_label.config(text=f"{self.player2_name} Captured:")
             self.captured_black_label.config(text=f"{self.player1_name} Captured:")
+            self.update_title()
             dialog.destroy()
-            self.start_timer()
+            self.start_timer(self.selected_bonus.get(), self.selected_clock_mode.get())
+            self.request_engine()
         tk.Button(dialog, text="Start Game", command=on_confirm).pack(pady=10)
         dialog.grab_set()  # modal
         self.master.wait_window(dialog)
@@ -295,29 +427,25 @@ class ChessGUI:
         self.points_label.config(text=f"Points Difference: {diff}")
 
     def playSound(self):
-        pygame.mixer.init()
-        pygame.mixer.music.load(self.soundEffect)
-        pygame.mixer.music.play()
-
-    def setup_board(self):
-        self.board = [[None for _ in range(8)] for _ in range(8)]
-        # White pieces
-        self.board[0][0] = self.board[0][7] = "R"
-        self.board[0][1] = self.board[0][6] = "N"
-        self.board[0][2] = self.board[0][5] = "B"
-        self.board[0][3] = "Q"
-        self.board[0][4] = "K"
-        for i in range(8):
-            self.board[1][i] = "P"
-        # Black pieces
-        self.board[7][0] = self.board[7][7] = "r"
-        self.board[7][1] = self.board[7][6] = "n"
-        self.board[7][2] = self.board[7][5] = "b"
-        self.board[7][3] = "q"
-        self.board[7][4] = "k"
-        for i in range(8):
-            self.board[6][i] = "p"
-    
+        mixer = get_mixer()
+        mixer.music.load(self.soundEffect)
+        mixer.music.play()
+
+    def update_title(self):
+        self.master.title(f"Chess - {self.player1_name} vs {self.player2_name} - {'White' if self.turn == 'W' else 'Black'} to move")
+
+    def is_in_check_board(self, board, color):
+        """Same as ChessRules.is_in_check_board, but plays the check sound once per check."""
+        in_check = super().is_in_check_board(board, color)
+        if in_check:
+            if not self.check_sound_played:
+                self.soundEffect = "check.mp3"
+                self.playSound()
+                self.check_sound_played = True
+        else:
+            self.check_sound_played = False
+        return in_check
+
     def transform_coords(self, row, col):
         if self.turn == "W":
             return 7 - row, 7 - col
@@ -362,170 +490,6 @@ class ChessGUI:
         y2 = y1 + self.square_size
         self.canvas.create_rectangle(x1, y1, x2, y2, outline="red", width=3, tags="selection")
 
-    def is_same_color(self, piece1, piece2):
-        """Returns True if both pieces are of the same color."""
-        return (piece1.isupper() and piece2.isupper()) or (piece1.islower() and piece2.islower())
-
-    def clear_path(self, fr, fc, tr, tc, board=None):
-        """Verifies that the path is clear from (fr,fc) to (tr,tc) for sliding pieces.
-           Uses provided board or self.board if None."""
-        if board is None:
-            board = self.board
-        d_row = tr - fr
-        d_col = tc - fc
-        step_row = (d_row // abs(d_row)) if d_row != 0 else 0
-        step_col = (d_col // abs(d_col)) if d_col != 0 else 0
-        r, c = fr + step_row, fc + step_col
-        while (r, c) != (tr, tc):
-            if board[r][c]:
-                return False
-            r += step_row
-            c += step_col
-        return True
-
-    def find_king(self, board, color):
-        """Finds the king of the specified color on a given board state."""
-        king_symbol = "K" if color == "W" else "k"
-        for r in range(8):
-            for c in range(8):
-                if board[r][c] == king_symbol:
-                    return (r, c)
-        return None
-
-    def is_in_check_board(self, board, color):
-        """
-        Returns True if the king of the given color is under attack in the provided board.
-        Uses the basic_validate move rule for opposing pieces.
-        """
-        if not hasattr(self, 'check_sound_played'):
-            self.check_sound_played = False
-        king_pos = self.find_king(board, color)
-        if not king_pos:
-            return True  # Should not happen; treat as check.
-        kr, kc = king_pos
-        opp_color = "B" if color == "W" else "W"
-        for r in range(8):
-            for c in range(8):
-                opp = board[r][c]
-                if opp and ((opp.isupper() and opp_color == "W") or (opp.islower() and opp_color == "B")):
-                    if self.basic_validate(opp, r, c, kr, kc, board, check_king_safety=False):
-                        if not self.check_sound_played:
-                            self.soundEffect = "check.mp3"
-                            self.playSound()
-                            self.check_sound_played = True
-                        return True
-        self.check_sound_played = False
-        return False
-
-    def basic_validate(self, piece, fr, fc, tr, tc, board, check_king_safety=True):
-        
-        """
-        Checks if a move follows piece-specific rules (ignoring overall king safety, unless specified).
-        Works on the provided board state.
-        """
-        self.master.title(f"Chess - {self.player1_name} vs {self.player2_name} - {'White' if self.turn == 'W' else 'Black'} to move")
-        if (fr, fc) == (tr, tc):
-            return False
-        dest_piece = board[tr][tc]
-        if dest_piece and ((piece.isupper() and dest_piece.isupper()) or (piece.islower() and dest_piece.islower())):
-            return False
-        direction = 1 if piece.isupper() else -1
-        piece_type = piece.upper()
-        dr = tr - fr
-        dc = tc - fc
-
-        # Pawn moves and captures.
-        if piece_type == "P":
-            # Move forward.
-            if dc == 0:
-                if dr == direction and dest_piece is None:
-                    return True
-                start_row = 1 if piece.isupper() else 6
-                if fr == start_row and dr == 2 * direction:
-                    if dest_piece is None and board[fr + direction][fc] is None:
-                        return True
-            if abs(dc) == 1 and dr == direction:
-                # Normal diagonal capture.
-                if dest_piece and not self.is_same_color(piece, dest_piece):
-                    return True
-                # En passant.
-                if dest_piece is None and self.en_passant_target == (tr, tc):
-                    return True
-            return False
-
-        # Knight moves.
-        elif piece_type == "N":
-            return (abs(dr), abs(dc)) in [(2, 1), (1, 2)]
-
-        # Bishop moves.
-        elif piece_type == "B":
-            if abs(dr) == abs(dc):
-                return self.clear_path(fr, fc, tr, tc, board)
-            return False
-
-        # Rook moves.
-        elif piece_type == "R":
-            if dr == 0 or dc == 0:
-                return self.clear_path(fr, fc, tr, tc, board)
-            return False
-        # Queen moves.
-        elif piece_type == "Q":
-            if abs(dr) == abs(dc) or dr == 0 or dc == 0:
-                return self.clear_path(fr, fc, tr, tc, board)
-            return False
-
-        # King moves.
-        elif piece_type == "K":
-            if max(abs(dr), abs(dc)) == 1:
-                return True
-            # Castling: King moving two squares horizontally.
-            if dr == 0 and abs(dc) == 2:
-                # Do not castle if the king is in check.
-                if check_king_safety and self.is_in_check_board(self.board, "W" if piece.isupper() else "B"):
-                    return False
-                color = "W" if piece.isupper() else "B"
-                if dc > 0:
-                    # Kingside castling.
-                    if not self.castling_rights[color]["kingside"]:
-                        return False
-                    rook_col = 7
-                else:
-                    # Queenside castling.
-                    if not self.castling_rights[color]["queenside"]:
-                        return False
-                    rook_col = 0
-                # Rook must be present and unmoved.
-                expected_rook = "R" if color == "W" else "r"
-                if board[fr][rook_col] != expected_rook:
-                    return False
-                # Squares between king and rook must be clear.
-                step = 1 if dc > 0 else -1
-                for c in range(fc + step, rook_col, step):
-                    if board[fr][c]:
-                        return False
-                print(f"Castling check: color={color}, kingside={dc>0}, rook at ({fr},{rook_col})={board[fr][rook_col]}, rights={self.castling_rights[color]}")
-                # The king may not pass through an attacked square.
-                for c in [fc, fc + step, fc + 2 * step]:
-                    temp_board = copy.deepcopy(board)
-                    temp_board[fr][fc] = None
-                    temp_board[fr][c] = piece
-                    if self.is_in_check_board(temp_board, color):
-                        print(f"Castling invalid: square {(fr, c)} is attacked during castling move")
-                        return False
-                return True
-
-        return False
-    
-    def get_valid_moves_for_piece(self, fr, fc):
-        piece = self.board[fr][fc]
-        if not piece:
-            return []
-        moves = []
-        for tr in range(8):
-            for tc in range(8):
-                if self.validate_move(piece, fr, fc, tr, tc):
-                    moves.append((tr, tc))
-        return moves
     def draw_move_circles(self):
         self.canvas.delete("move_circle")
         if not self.selected:
@@ -543,142 +507,13 @@ class ChessGUI:
             )
 
 
-    def simulate_move(self, fr, fc, tr, tc, extra_updates=None):
-        """
-        Create a deep copy of the board with a move applied. The extra_updates callback
-        can be used for handling en passant captures or castling rook movement.
-        """
-        new_board = copy.deepcopy(self.board)
-        piece = new_board[fr][fc]
-        new_board[tr][tc] = piece
-        new_board[fr][fc] = None
-        if extra_updates:
-            extra_updates(new_board)
-        return new_board
-
-    def get_extra_updates(self, piece, fr, fc, tr, tc):
-        """
-        Returns a callback function to update special moves (en passant and castling)
-        on the simulated board.
-        """
-        def update(new_board):
-            # En passant capture.
-            if piece.upper() == "P" and (tr, tc) == self.en_passant_target and self.board[tr][tc] is None:
-                cap_row = tr - (1 if piece.isupper() else -1)
-                new_board[cap_row][tc] = None
-            # Castling: Move the rook.
-            if piece.upper() == "K" and abs(tc - fc) == 2:
-                self.soundEffect="piece_capturing.mp3"
-                self.playSound()
-                color = "W" if piece.isupper() else "B"
-                if tc > fc:
-                    # Kingside castle.
-                    rook_from = (fr, 7)
-                    rook_to = (fr, fc + 1)
-                else:
-                    # Queenside castle.
-                    rook_from = (fr, 0)
-                    rook_to = (fr, fc - 1)
-                new_board[rook_to[0]][rook_to[1]] = new_board[rook_from[0]][rook_from[1]]
-                new_board[rook_from[0]][rook_from[1]] = None
-        return update
-
-    def validate_move(self, piece, fr, fc, tr, tc):
-        """
-        Validates a move by checking piece-specific rules and then simulating the move
-        to verify that the moving side's king is not left in check.
-        """
-        if not self.basic_validate(piece, fr, fc, tr, tc, self.board):
-            return False
-
-        extra = self.get_extra_updates(piece, fr, fc, tr, tc)
-        new_board = self.simulate_move(fr, fc, tr, tc, extra)
-        moving_color = "W" if piece.isupper() else "B"
-        if self.is_in_check_board(new_board, moving_color):
-            return False
-
-        return True
-
-    def update_special_states(self, piece, fr, fc, tr, tc):
-        """
-        Updates castling rights, en passant target, and promotions. Also switches the turn.
-        """
-        color = "W" if piece.isupper() else "B"
-        opponent = "B" if color == "W" else "W"
-        self.en_passant_target = None
-
-        # Pawn double move: set en passant target.
-        if piece.upper() == "P" and abs(tr - fr) == 2:
-            self.en_passant_target = (fr + (1 if piece.isupper() else -1), fc)
-
-        # Promotion: when a pawn reaches the last rank.
-        if piece.upper() == "P":
-            if (piece.isupper() and tr == 7) or (piece.islower() and tr == 0):
-                # Automatically promote to Queen.
-                self.board[tr][tc] = "Q" if piece.isupper() else "q"
-
-        # King move: lose castling rights.
-        if piece.upper() == "K":
-            self.castling_rights[color]["kingside"] = False
-            self.castling_rights[color]["queenside"] = False
-
-        # Rook move: update castling rights if it moves from its starting square.
-        if piece.upper() == "R":
-            if color == "W":
-                if (fr, fc) == (0, 0):
-                    self.castling_rights["W"]["queenside"] = False
-                elif (fr, fc) == (0, 7):
-                    self.castling_rights["W"]["kingside"] = False
-            else:
-                if (fr, fc) == (7, 0):
-                    self.castling_rights["B"]["queenside"] = False
-                elif (fr, fc) == (7, 7):
-                    self.castling_rights["B"]["kingside"] = False
-
-        # If a rook is captured from its starting square, adjust the opponent's castling rights.
-        captured = self.board[tr][tc]
-        if captured and captured.upper() == "R":
-            if opponent == "W":
-                if (tr, tc) == (0, 0):
-                    self.castling_rights["W"]["queenside"] = False
-                elif (tr, tc) == (0, 7):
-                    self.castling_rights["W"]["kingside"] = False
-            else:
-                if (tr, tc) == (7, 0):
-                    self.castling_rights["B"]["queenside"] = False
-                elif (tr, tc) == (7, 7):
-                    self.castling_rights["B"]["kingside"] = False
-
-        # Switch turn.
-        self.turn = opponent
-
-    def get_all_valid_moves(self, color):
-        """
-        Returns a list of valid moves for the given color.
-        Each move is represented as ((fr, fc), (tr, tc)).
-        """
-        moves = []
-        for r in range(8):
-            for c in range(8):
-                piece = self.board[r][c]
-                if piece:
-                    if (piece.isupper() and color == "W") or (piece.islower() and color == "B"):
-                        for tr in range(8):
-                            for tc in range(8):
-                                if self.validate_move(piece, r, c, tr, tc):
-                                    moves.append(((r, c), (tr, tc)))
-        return moves
-
-    def has_valid_moves(self, color):
-        """Returns True if the player of the given color has any valid moves."""
-        return len(self.get_all_valid_moves(color)) > 0
-
     def check_game_over(self):
         """
         Checks for end of game: if the current player has no valid moves,
         declares checkmate if in check or stalemate otherwise.
         """
         if not self.has_valid_moves(self.turn):
+            self.stop_timer()
             self.soundEffect="checkmate.mp3"
             self.playSound()
             if self.is_in_check_board(self.board, self.turn):
@@ -687,10 +522,10 @@ class ChessGUI:
             else:
                 messagebox.showinfo("Stalemate", "Stalemate! The game is a draw.")
             self.master.quit()
+            return True
+        return False
 
     def on_click(self, event):
-        if self.animating:
-            return
         display_col = event.x // self.square_size
         display_row = event.y // self.square_size
 
@@ -702,6 +537,43 @@ class ChessGUI:
         if not (0 <= row < 8 and 0 <= col < 8):
             return
 
+        if self.animating or self.engine_to_move():
+            # Queue the click as a premove; it is validated once the move lands
+            if len(self.premoves) < self.max_premove_clicks:
+                self.premoves.append((row, col))
+                drow, dcol = self.transform_coords(row, col)
+                self.highlight_premove(drow, dcol)
+            return
+
+        self.select_square(row, col)
+
+    def highlight_premove(self, row, col):
+        """Marks a queued premove square with a blue outline."""
+        x1 = col * self.square_size
+        y1 = row * self.square_size
+        x2 = x1 + self.square_size
+        y2 = y1 + self.square_size
+        self.canvas.create_rectangle(x1, y1, x2, y2, outline="blue", width=3, tags="premove")
+
+    def play_premoves(self):
+        """Replays the queued clicks against the new position, dropping them at the first invalid one."""
+        premoves = self.premoves
+        self.premoves = []
+        self.canvas.delete("premove")
+        for row, col in premoves:
+            if not self.select_square(row, col, premove=True):
+                if self.time_ran_out():
+                    return  # the window is gone
+                self.selected = None
+                self.canvas.delete("selection")
+                self.canvas.delete("move_circle")
+                return
+
+    def select_square(self, row, col, premove=False):
+        """
+        Handles a click on board square (row, col). Returns False if the click was rejected.
+        Premoves are rejected silently instead of showing a message box.
+        """
         piece = self.board[row][col]
 
         if self.selected is None:
@@ -713,7 +585,9 @@ class ChessGUI:
                 self.highlight_square(drow, dcol)
                 self.draw_move_circles()
             else:
-                messagebox.showinfo("Not your turn", "Please select one of your own pieces.")
+                if not premove:
+                    messagebox.showinfo("Not your turn", "Please select one of your own pieces.")
+                return False
         else:
             fr, fc = self.selected
             selected_piece = self.board[fr][fc]
@@ -732,23 +606,285 @@ class ChessGUI:
                 self.draw_move_circles()
             else:
                 # Attempt move to empty or enemy square
+                if self.time_ran_out():
+                    return False
                 if self.validate_move(selected_piece, fr, fc, row, col):
-                    self.timer_running = False
+                    # The move is made now: charge the mover and start the opponent's clock
+                    self.press_clock()
                     self.canvas.delete("move_circle")
                     self.canvas.delete("selection")
 
-                    extra = self.get_extra_updates(selected_piece, fr, fc, row, col)
-                    self.animate_move(selected_piece, fr, fc, row, col, extra)
                     self.soundEffect="piece_moving.mp3"
                     self.playSound()
+                    self.animate_move(selected_piece, fr, fc, row, col)
                 else:
-                    messagebox.showinfo("Invalid Move", "That move is not allowed.")
+                    if not premove:
+                        messagebox.showinfo("Invalid Move", "That move is not allowed.")
+                    return False
+        return True
 
-    def animate_move(self, piece, fr, fc, tr, tc, extra_updates):
+    def attach_engine(self, engine, side=None, movetime_ms=1000):
+        """Lets a UCIEngine play `side` ("W"/"B"), or just analyse when side is None."""
+        self.engine = engine
+        self.engine_side = side
+        self.engine_movetime = movetime_ms
+        self.engine_label = tk.Label(self.sidebar, text=f"Engine: {engine.name}",
+                                     font=("Arial", 10), justify="left", wraplength=200)
+        self.engine_label.pack(pady=(0, 10))
+        self.poll_engine()
+
+    def engine_to_move(self):
+        return self.engine is not None and self.engine_side == self.turn
+
+    def request_engine(self):
+        """Sends the current position: a timed search on the engine's turn, infinite analysis otherwise."""
+        if self.engine is None:
+            return
+        self.engine.stop()
+        self.engine.position(self.start_fen, [record.name() for record in self.move_stack])
+        if not self.engine_to_move():
+            self.engine.go(infinite=True)
+        elif self.clock is not None:
+            inc = self.clock.bonus * 1000 if self.clock.mode == "increment" else 0
+            self.engine.go(wtime=self.clock.time_left("W") * 1000, btime=self.clock.time_left("B") * 1000,
+                           winc=inc, binc=inc)
+        else:
+            self.engine.go(movetime_ms=self.engine_movetime)
+
+    def poll_engine(self):
+        """Drains engine output without blocking Tk; reschedules itself every 50 ms."""
+        for line in self.engine.poll():
+            if line is None:
+                self.engine_label.config(text="Engine exited")
+                self.engine = None
+                return
+            if line.startswith("info"):
+                if self.engine.searching > 1:
+                    continue  # from a stopped search: its score is for the previous side to move
+                from uci_engine import parse_info  # already loaded by main() with --engine
+                info = parse_info(line)
+                if "score" in info:
+                    self.engine_label.config(text=self.format_engine_info(info))
+            elif line.startswith("bestmove") and self.engine.searching == 0:
+                # Only the answer to the latest "go" counts; stopped analyses are ignored
+                if self.engine_to_move() and not self.animating:
+                    self.play_engine_move(line.split()[1])
+        self.master.after(50, self.poll_engine)
+
+    def format_engine_info(self, info):
+        kind, value = info["score"]
+        if self.turn == "B":
+            value = -value  # UCI scores are from the side to move; show White's view
+        score = f"#{value}" if kind == "mate" else f"{value / 100:+.2f}"
+        pv = " ".join(info.get("pv", [])[:6])
+        return f"{self.engine.name}\nDepth {info.get('depth', '?')}  Eval {score}\n{pv}"
+
+    def play_engine_move(self, text):
+        try:
+            fr, fc, tr, tc = parse_move(text)
+        except ValueError:
+            return
+        if self.time_ran_out():
+            return
+        piece = self.board[fr][fc]
+        if not piece or (piece.isupper() != (self.turn == "W")) or not self.validate_move(piece, fr, fc, tr, tc):
+            self.engine_label.config(text=f"Engine sent an illegal move: {text}")
+            return
+        self.press_clock()
+        self.selected = None
+        self.canvas.delete("selection")
+        self.canvas.delete("move_circle")
+        self.soundEffect="piece_moving.mp3"
+        self.playSound()
+        self.animate_move(piece, fr, fc, tr, tc)
+
+    def save_game(self):
+        """Appends the game (up to the current ply) to GAMES_FILE, e.g. for board_tensor.py export."""
+        moves = " ".join(record.name() for record in self.move_stack)
+        with open(GAMES_FILE, "a") as f:
+            f.write(f"fen {self.start_fen} moves {moves}\n")
+        messagebox.showinfo("Game Saved", f"{len(self.move_stack)} moves saved to {GAMES_FILE}.")
+
+    def press_clock(self):
+        """The side to move has just made a move: remember the clock for takebacks, then press it."""
+        if self.clock is not None:
+            self.clock_before_move = self.clock.snapshot()
+            self.clock.press(self.turn)
+            self.clock_after_move = self.clock.snapshot()
+
+    def undo_move(self):
+        """Takes back the last move from its undo record. Returns False if there is none."""
+        if not self.move_stack:
+            return False
+        record = self.move_stack.pop()
+        self.unmake_move(record)
+        if record.captured is not None:
+            if record.captured.isupper():
+                self.captured_black.pop()
+            else:
+                self.captured_white.pop()
+        if self.clock is not None and record.clock is not None:
+            self.clock.restore(record.clock, self.turn)
+        self.redo_stack.append(record)
+        return True
+
+    def redo_move(self):
+        """Replays the last taken-back move. Returns False if there is none."""
+        if not self.redo_stack:
+            return False
+        old = self.redo_stack.pop()
+        record = self.make_move(old.fr, old.fc, old.tr, old.tc)
+        # Put back the clock as it was after the move; pressing it again would charge the
+        # time spent browsing and add the increment a second time
+        record.clock, record.clock_after = old.clock, old.clock_after
+        if self.clock is not None and old.clock_after is not None:
+            self.clock.restore(old.clock_after, self.turn)
+        if record.captured is not None:
+            if record.captured.isupper():
+                self.captured_black.append(record.captured)
+            else:
+                self.captured_white.append(record.captured)
+        self.move_stack.append(record)
+        return True
+
+    def jump_to_ply(self, ply):
+        """Steps back or forward one move at a time to `ply`, then redraws once."""
+        if self.animating:
+            return
+        old_ply = len(self.move_stack)
+        while len(self.move_stack) > ply and self.undo_move():
+            pass
+        while len(self.move_stack) < ply and self.redo_move():
+            pass
+        self.after_navigation(old_ply)
+
+    def on_undo(self):
+        if self.animating or not self.move_stack:
+            return
+        ply = len(self.move_stack) - 1
+        # Against an engine, also take back the engine's reply so the human is to move
+        if ply > 0 and self.engine is not None and self.engine_side is not None \
+                and self.move_stack[-1].piece.isupper() == (self.engine_side == "W"):
+            ply -= 1
+        self.jump_to_ply(ply)
+
+    def on_redo(self):
+        self.jump_to_ply(len(self.move_stack) + 1)
+
+    def on_move_list_select(self, event):
+        selection = self.move_listbox.curselection()
+        if selection:
+            self.jump_to_ply(selection[0])  # line 0 is the start position
+
+    def after_navigation(self, old_ply):
+        self.selected = None
+        self.premoves = []
+        self.canvas.delete("selection")
+        self.canvas.delete("move_circle")
+        self.canvas.delete("premove")
+        self.draw_board()
+        self.draw_pieces()
+        self.update_sidebar()
+        self.update_title()
+        self.recolor_move_list(old_ply)
+        if self.clock is not None and self.refresh_timer():
+            return
+        self.request_engine()
+
+    def move_list_text(self, index, record):
+        number = index // 2 + 1
+        return f"{number}. {record.name()}" if record.piece.isupper() else f"{number}... {record.name()}"
+
+    def append_to_move_list(self, index):
+        self.move_listbox.insert("end", self.move_list_text(index, self.move_stack[index]))
+        self.select_move_list_line(index + 1)
+
+    def rebuild_move_list(self):
+        self.move_listbox.delete(1, "end")
+        line = list(self.move_stack) + self.redo_stack[::-1]
+        for index, record in enumerate(line):
+            self.move_listbox.insert("end", self.move_list_text(index, record))
+        self.recolor_move_list(len(line))
+
+    def recolor_move_list(self, old_ply):
+        """Greys out moves past the current ply; only lines between old_ply and now change."""
+        ply = len(self.move_stack)
+        for line in range(min(ply, old_ply) + 1, max(ply, old_ply) + 1):
+            self.move_listbox.itemconfig(line, foreground="gray" if line > ply else "black")
+        self.select_move_list_line(ply)
+
+    def select_move_list_line(self, line):
+        self.move_listbox.selection_clear(0, "end")
+        self.move_listbox.selection_set(line)
+        self.move_listbox.see(line)
+
+    def animate_move(self, piece, fr, fc, tr, tc):
         if self.animating:
             return  # ignore new animation if one is running
         self.animating = True
 
+        def finish():
+            # Update board state
+            record = self.make_move(fr, fc, tr, tc)
+            record.clock, record.clock_after = self.clock_before_move, self.clock_after_move
+            captured_piece = record.captured
+            self.move_stack.append(record)
+            if self.redo_stack:
+                # A new move replaces the taken-back line
+                self.redo_stack = []
+                self.rebuild_move_list()
+            else:
+                self.append_to_move_list(len(self.move_stack) - 1)
+            self.update_title()
+
+            # Castling moves the rook too
+            if piece.upper() == "K" and abs(tc - fc) == 2:
+                self.soundEffect = "piece_capturing.mp3"
+                self.playSound()
+
+            # If captured piece detected, do sound + add to captured lists outside of animate_move maybe
+            if captured_piece is not None:
+                self.soundEffect = "piece_capturing.mp3"
+                self.playSound()
+
+                # Add to captured list:
+                if captured_piece.isupper():
+                    self.captured_black.append(captured_piece)
+                else:
+                    self.captured_white.append(captured_piece)
+
+            # Clean up animation image
+            self.canvas.delete("anim_piece")
+
+            # Redraw board and pieces normally
+            self.draw_board()
+            self.draw_pieces()
+            game_over = self.check_game_over()
+            if self.profiler is not None:
+                profile_record = self.profiler.end_move(record.name())
+                if self.profile_label is not None:
+                    self.profile_label.config(text=self.profiler.report(profile_record))
+
+            # Clear selection and move indicators
+            self.selected = None
+            self.canvas.delete("selection")
+            self.canvas.delete("move_circle")
+            self.animating = False
+            self.update_sidebar()
+            if self.clock is not None and self.refresh_timer():
+                # The opponent's flag fell during the animation: the window is gone
+                self.premoves = []
+                return
+            if game_over:
+                self.premoves = []
+            else:
+                self.request_engine()
+                self.play_premoves()
+
+        if self.animation_duration <= 0:
+            finish()
+            return
+
         # Because the board might be flipped, transform coordinates appropriately
         start_drow, start_dcol = self.transform_coords(fr, fc)
         end_drow, end_dcol = self.transform_coords(tr, tc)
@@ -759,69 +895,67 @@ class ChessGUI:
 
         # Create a piece image on canvas to animate (on top layer)
         anim_img = self.canvas.create_image(start_x, start_y, image=self.images[piece], tags="anim_piece")
-        # Number of steps and delay per step for smooth 1 sec animation (e.g., 30 FPS)
-        steps = 25
-        delay = 30  # milliseconds ~30 FPS
-
-        delta_x = (end_x - start_x) / steps
-        delta_y = (end_y - start_y) / steps
-
-        def move_step(step=0):
-            if step < steps:
-                self.canvas.move(anim_img, delta_x, delta_y)
-                self.canvas.after(delay, move_step, step + 1)
+        start_time = time.monotonic()
+
+        def move_step():
+            # Position follows the wall clock, so a slow frame skips ahead instead of stretching the animation
+            t = (time.monotonic() - start_time) / self.animation_duration
+            if t < 1:
+                self.canvas.coords(anim_img, start_x + (end_x - start_x) * t, start_y + (end_y - start_y) * t)
+                self.canvas.after(self.animation_frame_ms, move_step)
             else:
-                captured_piece = None
-                # Determine captured piece before the move update
-                # Normal capture
-                if self.board[tr][tc] is not None and (tr, tc) != (fr, fc):
-                    captured_piece = self.board[tr][tc]
-                # En passant capture
-                elif (piece.upper() == 'P' and self.en_passant_target == (tr, tc)):
-                    cap_row = tr - (1 if piece.isupper() else -1)
-                    captured_piece = self.board[cap_row][tc]
-
-                # Update board state
-                self.board = self.simulate_move(fr, fc, tr, tc, extra_updates)
-                self.update_special_states(piece, fr, fc, tr, tc)
-
-                # If captured piece detected, do sound + add to captured lists outside of animate_move maybe
-                if captured_piece is not None:
-                    self.soundEffect = "piece_capturing.mp3"
-                    self.playSound()
-
-                    # Add to captured list:
-                    if captured_piece.isupper():
-                        self.captured_black.append(captured_piece)
-                    else:
-                        self.captured_white.append(captured_piece)
-
-                # Clean up animation image
-                self.canvas.delete("anim_piece")
-
-                # Redraw board and pieces normally
-                self.draw_board()
-                self.draw_pieces()
-                self.check_game_over()
-
-                # Clear selection and move indicators
-                self.selected = None
-                self.canvas.delete("selection")
-                self.canvas.delete("move_circle")
-                self.animating = False
-                self.update_sidebar()
-                self.timer_running = True
-                self.update_timer()
+                finish()
 
         move_step()
 
 
-
 def main():
+    parser = argparse.ArgumentParser(description="Advanced Chess GUI")
+    parser.add_argument("--animation", type=float, default=0.3,
+                        help="move animation duration in seconds (0 disables it)")
+    parser.add_argument("--profile", action="store_true",
+                        help="count and time the rules/rendering hot paths")
+    parser.add_argument("--profile-pane", action="store_true",
+                        help="show the per-move profile in the sidebar (implies --profile)")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="write the profile to FILE on exit (.csv or .json, implies --profile)")
+    parser.add_argument("--engine", metavar="CMD",
+                        help="UCI engine command, e.g. \"python uci_frontend.py\"")
+    parser.add_argument("--engine-side", choices=["white", "black", "none"], default="none",
+                        help="side the engine plays (none = analysis only)")
+    parser.add_argument("--engine-movetime", type=int, default=1000,
+                        help="engine thinking time in ms per move without a clock")
+    parser.add_argument("--bench-startup", action="store_true",
+                        help="print startup timings as JSON and exit (used by startup_bench.py)")
+    args = parser.parse_args()
+
+    if args.bench_startup:
+        root = tk.Tk()
+        app = ChessGUI(root, args.animation)
+        app.show(ask_time_control=False)
+        print(json.dumps(app.startup_marks))
+        root.destroy()
+        return
+
+    profiler = None
+    if args.profile or args.profile_pane or args.profile_out:
+        from profiler import HotPathProfiler
+        profiler = HotPathProfiler()
+
     root = tk.Tk()
-    app = ChessGUI(root)
-    app.time_selection_dialog()
+    app = ChessGUI(root, args.animation, profiler, args.profile_pane)
+    engine = None
+    if args.engine:
+        from uci_engine import UCIEngine
+        engine = UCIEngine(shlex.split(args.engine))
+        side = {"white": "W", "black": "B", "none": None}[args.engine_side]
+        app.attach_engine(engine, side, args.engine_movetime)
+    app.show()
     root.mainloop()
+    if engine is not None:
+        engine.quit()
+    if profiler is not None and args.profile_out:
+        profiler.export(args.profile_out)
 
 if __name__ == "__main__":
     main()
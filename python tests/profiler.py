@@ -0,0 +1,127 @@
+import csv
+import json
+import math
+import time
+from array import array
+
+# Methods of ChessGUI that run many times per move
+HOT_PATHS = ("basic_validate", "is_in_check_board", "simulate_move", "draw_board", "check_game_over")
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples), math.ceil(pct / 100 * len(sorted_samples))) - 1)
+    return sorted_samples[rank]
+
+
+def summarize(samples):
+    """Call count plus cumulative and percentile timings (ms) for a list of durations in seconds."""
+    ordered = sorted(samples)
+    return {
+        "calls": len(ordered),
+        "total_ms": sum(ordered) * 1000,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p90_ms": percentile(ordered, 90) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+        "max_ms": (ordered[-1] * 1000) if ordered else 0.0,
+    }
+
+
+class HotPathProfiler:
+    """
+    Opt-in call counter/timer for the rules and rendering hot paths.
+
+    attach() shadows the chosen methods on one instance with timing wrappers and
+    detach() removes them again, so nothing is wrapped (and nothing is paid) unless
+    profiling was switched on. Timings are inclusive: is_in_check_board calls made
+    from basic_validate count towards both.
+    """
+
+    def __init__(self, names=HOT_PATHS):
+        self.names = tuple(names)
+        self.target = None
+        self.current = {}  # name -> durations for the move in progress
+        self.session = {}  # name -> every duration this session
+        self.moves = []  # one summary dict per committed move
+
+    def attach(self, obj):
+        self.detach()
+        self.target = obj
+        for name in self.names:
+            setattr(obj, name, self._wrap(name, getattr(obj, name)))
+
+    def detach(self):
+        if self.target is None:
+            return
+        for name in self.names:
+            self.target.__dict__.pop(name, None)
+        self.target = None
+
+    def _wrap(self, name, func):
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                samples = self.current.get(name)
+                if samples is None:
+                    samples = self.current[name] = array("d")
+                samples.append(elapsed)
+
+        timed.__name__ = name
+        timed.__wrapped__ = func
+        return timed
+
+    def end_move(self, label):
+        """Closes the current move: summarizes its samples and starts a new bucket."""
+        functions = {name: summarize(samples) for name, samples in self.current.items()}
+        for name, samples in self.current.items():
+            self.session.setdefault(name, array("d")).extend(samples)
+        self.current = {}
+        record = {"ply": len(self.moves) + 1, "move": label, "functions": functions}
+        self.moves.append(record)
+        return record
+
+    def totals(self):
+        """Per-function summary over the whole session."""
+        return {name: summarize(samples) for name, samples in self.session.items()}
+
+    def report(self, record=None):
+        """Short fixed-width text table of a move record (default: the last move)."""
+        if record is None:
+            if not self.moves:
+                return "No moves profiled yet"
+            record = self.moves[-1]
+        lines = [f"Ply {record['ply']} {record['move']}", f"{'function':<18}{'calls':>7}{'ms':>9}{'p99':>8}"]
+        for name in self.names:
+            stats = record["functions"].get(name)
+            if stats:
+                lines.append(f"{name:<18}{stats['calls']:>7}{stats['total_ms']:>9.1f}{stats['p99_ms']:>8.3f}")
+        return "\n".join(lines)
+
+    def export_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"moves": self.moves, "totals": self.totals()}, f, indent=2)
+
+    def export_csv(self, path):
+        fields = ["calls", "total_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["ply", "move", "function"] + fields)
+            for record in self.moves:
+                for name, stats in record["functions"].items():
+                    writer.writerow([record["ply"], record["move"], name] + [stats[k] for k in fields])
+            for name, stats in self.totals().items():
+                writer.writerow(["total", "", name] + [stats[k] for k in fields])
+
+    def export(self, path):
+        """Writes CSV for a .csv path, JSON otherwise."""
+        if path.lower().endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
@@ -0,0 +1,56 @@
+"""
+Cold-start benchmark for hello.py.
+
+Starts `hello.py --bench-startup` in fresh interpreters and reports
+time-to-first-paint (window and empty board drawn) and time-to-interactive
+(sprites loaded, clicks bound), both measured from process launch.
+Needs a display; on a headless machine run it under a virtual X server:
+
+    xvfb-run -a python startup_bench.py --runs 20
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_once():
+    # time.monotonic() is system-wide on Linux, so it can be compared with the child's marks
+    launched = time.monotonic()
+    out = subprocess.run([sys.executable, "hello.py", "--bench-startup"], cwd=HERE,
+                         capture_output=True, text=True, check=True).stdout
+    marks = json.loads(out.strip().splitlines()[-1])
+    return {
+        "interpreter_ms": (marks["module_start"] - launched) * 1000,
+        "first_paint_ms": (marks["first_paint"] - launched) * 1000,
+        "interactive_ms": (marks["interactive"] - launched) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--cold-sprites", action="store_true",
+                        help="clear the sprite cache before every run (measures the Pillow path)")
+    args = parser.parse_args()
+
+    results = []
+    for _ in range(args.runs):
+        if args.cold_sprites:
+            shutil.rmtree(os.path.join(HERE, "sprite_cache"), ignore_errors=True)
+        results.append(run_once())
+
+    print(f"{'metric':<16}{'median':>10}{'min':>10}{'max':>10}  (ms, {args.runs} runs)")
+    for key in ("interpreter_ms", "first_paint_ms", "interactive_ms"):
+        values = [r[key] for r in results]
+        print(f"{key:<16}{statistics.median(values):>10.1f}{min(values):>10.1f}{max(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
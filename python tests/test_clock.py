@@ -0,0 +1,137 @@
+"""Game clock: redraw scheduling, and flag fall handling in the GUI."""
+import tkinter as tk
+
+import hello
+from chess_clock import ChessClock
+from chess_rules import ChessRules, parse_move
+from hello import ChessGUI
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeTk:
+    """Stands in for the root window and every widget; like Tk, it raises TclError once destroyed."""
+
+    def __init__(self):
+        self.destroyed = False
+
+    def destroy(self):
+        self.destroyed = True
+
+    def winfo_children(self):
+        return []
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            if self.destroyed:
+                raise tk.TclError(f"can't invoke \"{name}\" command: application has been destroyed")
+        return call
+
+
+def test_next_redraw_waits_for_the_displayed_second_to_change():
+    now = FakeTime()
+    clock = ChessClock(300, time_source=now)
+    clock.start("W")
+    assert clock.next_redraw_ms() == 1001  # 05:00 turns 04:59 after a whole second
+    now.now += 0.25
+    assert clock.next_redraw_ms() == 751
+    now.now += 0.75
+    assert clock.next_redraw_ms() == 1001
+
+
+def test_next_redraw_waits_out_the_delay():
+    now = FakeTime()
+    clock = ChessClock(300, 5, "delay", time_source=now)
+    clock.start("W")
+    for spent, expected in ((0, 6001), (1, 5001), (4.9, 1101), (5.5, 501)):
+        now.now = 1000.0 + spent
+        assert abs(clock.next_redraw_ms() - expected) <= 1
+
+
+def test_next_redraw_shows_tenths_in_the_last_ten_seconds():
+    now = FakeTime()
+    clock = ChessClock(9.5, 2, "delay", time_source=now)
+    clock.start("W")
+    assert clock.next_redraw_ms() == 2101
+    now.now += 3
+    assert clock.next_redraw_ms() == 101
+
+
+def make_gui(clock, monkeypatch):
+    """A ChessGUI without a display: all widgets are one FakeTk, message boxes are recorded."""
+    messages = []
+    monkeypatch.setattr(hello.messagebox, "showinfo", lambda title, text: messages.append(text))
+    gui = ChessGUI.__new__(ChessGUI)
+    ChessRules.__init__(gui)
+    window = FakeTk()
+    gui.master = gui.canvas = gui.move_listbox = window
+    gui.white_timer_label = gui.black_timer_label = gui.points_label = window
+    gui.captured_white_label = gui.captured_black_label = window
+    gui.captured_white_pieces_frame = gui.captured_black_pieces_frame = window
+    gui.player1_name, gui.player2_name = "White", "Black"
+    gui.clock = clock
+    gui.timer_after_id = None
+    gui.flag_fallen = False
+    gui.check_sound_played = False
+    gui.square_size = 60
+    gui.colors = ["#F0D9B5", "#B58863"]
+    gui.images = dict.fromkeys("KQRBNPkqrbnp")
+    gui.animating = False
+    gui.animation_duration = 0
+    gui.premoves = []
+    gui.max_premove_clicks = 2
+    gui.captured_white = []
+    gui.captured_black = []
+    gui.selected = None
+    gui.profiler = None
+    gui.profile_label = None
+    gui.engine = None
+    gui.engine_side = None
+    gui.move_stack = []
+    gui.redo_stack = []
+    gui.playSound = lambda: None
+    return gui, window, messages
+
+
+def click_move(gui, text):
+    """The mover clicks piece and destination; animate_move then runs finish() right away."""
+    fr, fc, tr, tc = parse_move(text)
+    assert gui.select_square(fr, fc)
+    assert gui.select_square(tr, tc)
+
+
+def test_flag_falling_during_the_move_animation_ends_the_game(monkeypatch):
+    now = FakeTime()
+    clock = ChessClock(10, time_source=now)
+    gui, window, messages = make_gui(clock, monkeypatch)
+    clock.start("W")
+    gui.premoves = [parse_move("e7e5")[:2], parse_move("e7e5")[2:]]
+    # Black's clock starts when White presses it; it runs out before the move has landed
+    fr, fc, tr, tc = parse_move("e2e4")
+    gui.press_clock()
+    now.now += 11
+    gui.animate_move("P", fr, fc, tr, tc)
+    assert messages == ["Black ran out of time! White wins!"]
+    assert window.destroyed
+    assert gui.premoves == []
+    assert gui.board[4][4] is None  # the premove was not played
+
+
+def test_flag_falling_before_a_premove_ends_the_game(monkeypatch):
+    now = FakeTime()
+    clock = ChessClock(10, time_source=now)
+    gui, window, messages = make_gui(clock, monkeypatch)
+    clock.start("W")
+    gui.premoves = [parse_move("e7e5")[:2], parse_move("e7e5")[2:]]
+    # The flag falls after finish() redrew the clock, right before the premove is replayed
+    gui.request_engine = lambda: setattr(now, "now", now.now + 11)
+    click_move(gui, "e2e4")
+    assert messages == ["Black ran out of time! White wins!"]
+    assert window.destroyed
+    assert gui.board[4][4] is None
@@ -0,0 +1,54 @@
+"""ChessRules: castling rights, FEN round trips and game-end detection."""
+import pytest
+
+from chess_rules import ChessRules, parse_move
+
+
+def position(fen):
+    rules = ChessRules()
+    rules.set_fen(fen)
+    return rules
+
+
+@pytest.mark.parametrize("fen", [
+    ChessRules().to_fen(),
+    "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1",
+    "rnbqkbnr/pp1ppppp/8/2p5/4P3/8/PPPP1PPP/RNBQKBNR w KQkq c6 0 2",
+    "7k/P7/8/8/8/8/8/4K3 b - - 12 40",
+])
+def test_fen_round_trip(fen):
+    assert position(fen).to_fen() == fen
+
+
+@pytest.mark.parametrize("fen, move, after", [
+    # A rook captured on its home square takes that side's castling right with it
+    ("r3k2r/8/8/8/8/8/1B6/4K3 w kq - 0 1", "b2h8", "r3k2B/8/8/8/8/8/8/4K3 b q - 0 1"),
+    ("r3k3/8/8/8/8/8/6B1/4K3 w q - 0 1", "g2a8", "B3k3/8/8/8/8/8/8/4K3 b - - 0 1"),
+    ("4k3/8/8/8/8/8/6b1/R3K2R b KQ - 0 1", "g2h1", "4k3/8/8/8/8/8/8/R3K2b w Q - 0 2"),
+    # Moving a rook or the king gives up the rights
+    ("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", "a1a2", "r3k2r/8/8/8/8/8/R7/4K2R b Kkq - 1 1"),
+    ("r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1", "e8d8", "r2k3r/8/8/8/8/8/8/R3K2R w KQ - 1 2"),
+])
+def test_castling_rights_after_move(fen, move, after):
+    rules = position(fen)
+    record = rules.make_move(*parse_move(move))
+    assert rules.to_fen() == after
+    rules.unmake_move(record)
+    assert rules.to_fen() == fen
+
+
+def test_castled_rook_cannot_castle_after_being_captured():
+    rules = position("r3k2r/8/8/8/8/8/1B6/4K3 w kq - 0 1")
+    rules.make_move(*parse_move("b2h8"))
+    king_moves = {(tr, tc) for (fr, fc), (tr, tc) in rules.iter_valid_moves("B") if (fr, fc) == (7, 4)}
+    assert (7, 6) not in king_moves
+    assert (7, 2) in king_moves
+
+
+def test_checkmate_and_stalemate_have_no_moves():
+    mate = position("rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3")
+    assert not mate.has_valid_moves("W")
+    assert mate.is_in_check_board(mate.board, "W")
+    stalemate = position("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")
+    assert not stalemate.has_valid_moves("B")
+    assert not stalemate.is_in_check_board(stalemate.board, "B")
@@ -0,0 +1,108 @@
+"""GameServer protocol: requests through handle(), and connections through serve_client()."""
+import asyncio
+import json
+
+import pytest
+
+from chess_server import GameServer
+
+
+def play(server, game, moves, owned=None):
+    response = None
+    for move in moves:
+        response = server.handle({"op": "move", "game": game, "move": move}, owned)
+    return response
+
+
+def test_checkmate_ends_the_game():
+    server = GameServer()
+    game = server.handle({"op": "new"})["game"]
+    response = play(server, game, ["f2f3", "e7e5", "g2g4", "d8h4"])
+    assert response["result"] == "checkmate 0-1"
+    assert server.handle({"op": "moves", "game": game})["moves"] == []
+    with pytest.raises(ValueError, match="game is over"):
+        play(server, game, ["a2a3"])
+
+
+def test_stalemate_ends_the_game():
+    server = GameServer()
+    game = server.handle({"op": "new"})["game"]
+    server.games[game].rules.set_fen("7k/4Q3/6K1/8/8/8/8/8 w - - 0 1")
+    assert play(server, game, ["e7f7"])["result"] == "stalemate 1/2-1/2"
+
+
+def test_promotions_are_named_with_the_piece():
+    server = GameServer()
+    game = server.handle({"op": "new"})["game"]
+    server.games[game].rules.set_fen("7k/P7/8/8/8/8/8/4K3 w - - 0 1")
+    assert "a7a8q" in server.handle({"op": "moves", "game": game})["moves"]
+
+
+def test_unknown_clock_mode_is_rejected():
+    server = GameServer()
+    with pytest.raises(ValueError, match="clock mode"):
+        server.handle({"op": "new", "time": 60, "mode": "bogus"})
+    assert server.games == {}
+    game = server.handle({"op": "new", "time": 60, "bonus": 2, "mode": "delay"})["game"]
+    assert server.games[game].clock.mode == "delay"
+
+
+def test_only_the_owning_connection_moves_or_closes_a_game():
+    server = GameServer()
+    mine, theirs = set(), set()
+    game = server.handle({"op": "new"}, theirs)["game"]
+    with pytest.raises(ValueError, match="another connection"):
+        play(server, game, ["e2e4"], mine)
+    with pytest.raises(ValueError, match="another connection"):
+        server.handle({"op": "close", "game": game}, mine)
+    assert server.handle({"op": "state", "game": game}, mine)["state"]["plies"] == 0
+    play(server, game, ["e2e4"], theirs)
+    assert server.handle({"op": "close", "game": game}, theirs) == {"ok": True}
+    assert server.games == {}
+
+
+async def talk(server, lines):
+    """Sends raw request lines over one connection; returns the decoded responses."""
+    listener = await asyncio.start_server(server.serve_client, "127.0.0.1", 0, limit=2 ** 16)
+    port = listener.sockets[0].getsockname()[1]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    responses = []
+    for line in lines:
+        writer.write(line.encode() + b"\n")
+        await writer.drain()
+        responses.append(json.loads(await reader.readline()))
+    writer.close()
+    await writer.wait_closed()
+    await asyncio.sleep(0.05)  # let the server notice the disconnect
+    listener.close()
+    await listener.wait_closed()
+    return responses
+
+
+def test_malformed_requests_get_an_error_response():
+    server = GameServer()
+    responses = asyncio.run(talk(server, [
+        "not json",
+        "[1, 2]",
+        "[" * 50000,
+        json.dumps({"op": "bogus", "id": 7}),
+        json.dumps({"op": "state", "game": 99}),
+        json.dumps({"op": "new", "id": 8}),
+    ]))
+    assert [r["ok"] for r in responses] == [False, False, False, False, False, True]
+    assert responses[1]["error"] == "request must be a JSON object"
+    assert responses[2]["error"] == "request nested too deeply"
+    assert responses[3]["id"] == 7
+    assert responses[4]["error"] == "unknown game"
+    assert responses[5]["id"] == 8
+
+
+def test_games_are_freed_when_their_connection_closes():
+    server = GameServer()
+    responses = asyncio.run(talk(server, [
+        json.dumps({"op": "new"}),
+        json.dumps({"op": "new", "time": 60}),
+        json.dumps({"op": "move", "game": 1, "move": "e2e4"}),
+    ]))
+    assert [r["ok"] for r in responses] == [True, True, True]
+    assert server.games == {}
@@ -0,0 +1,86 @@
+"""Takebacks: make_move/unmake_move must restore positions exactly, undo/redo must restore the clock."""
+import random
+
+from chess_clock import ChessClock
+from chess_rules import ChessRules
+from hello import ChessGUI
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def play_random_game(rules, rng, max_plies=120):
+    """Plays random legal moves; returns (fen before the move, record) for each ply."""
+    played = []
+    for _ in range(max_plies):
+        moves = list(rules.iter_valid_moves(rules.turn))
+        if not moves:
+            break
+        (fr, fc), (tr, tc) = rng.choice(moves)
+        fen = rules.to_fen()
+        played.append((fen, rules.make_move(fr, fc, tr, tc)))
+    return played
+
+
+def test_make_unmake_restores_fen_in_random_games():
+    rng = random.Random(20260101)
+    for _ in range(30):
+        rules = ChessRules()
+        played = play_random_game(rules, rng)
+        for fen, record in reversed(played):
+            rules.unmake_move(record)
+            assert rules.to_fen() == fen
+        assert rules.to_fen() == ChessRules().to_fen()
+
+
+def make_gui(clock):
+    """A ChessGUI with just the state undo_move/redo_move use, no Tk window."""
+    gui = ChessGUI.__new__(ChessGUI)
+    ChessRules.__init__(gui)
+    gui.clock = clock
+    gui.captured_white = []
+    gui.captured_black = []
+    gui.move_stack = []
+    gui.redo_stack = []
+    gui.clock_before_move = None
+    gui.clock_after_move = None
+    return gui
+
+
+def play_like_gui(gui, fr, fc, tr, tc):
+    """What a click does: press the clock, then animate_move's finish() makes the move."""
+    gui.press_clock()
+    record = gui.make_move(fr, fc, tr, tc)
+    record.clock, record.clock_after = gui.clock_before_move, gui.clock_after_move
+    if record.captured is not None:
+        (gui.captured_black if record.captured.isupper() else gui.captured_white).append(record.captured)
+    gui.move_stack.append(record)
+
+
+def test_undo_redo_restores_clock():
+    now = FakeTime()
+    clock = ChessClock(300, bonus=2, time_source=now)
+    gui = make_gui(clock)
+    clock.start("W")
+    rng = random.Random(7)
+    for _ in range(20):
+        now.now += rng.uniform(0.5, 10)
+        (fr, fc), (tr, tc) = rng.choice(list(gui.iter_valid_moves(gui.turn)))
+        play_like_gui(gui, fr, fc, tr, tc)
+    fen, banked, active = gui.to_fen(), clock.snapshot(), clock.active
+
+    # Time spent browsing the game must not be charged to anyone
+    while gui.undo_move():
+        now.now += 30
+    assert clock.snapshot() == (300, 300)
+    assert clock.active == "W"
+    while gui.redo_move():
+        now.now += 30
+    assert gui.to_fen() == fen
+    assert clock.snapshot() == banked
+    assert clock.active == active
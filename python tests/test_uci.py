@@ -0,0 +1,81 @@
+"""Drives the bundled uci_frontend.py through UCIEngine, the way the GUI does."""
+import os
+import sys
+import time
+
+import pytest
+
+from chess_rules import ChessRules, move_name, parse_move
+from uci_engine import UCIEngine
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture
+def engine():
+    engine = UCIEngine([sys.executable, os.path.join(HERE, "uci_frontend.py")])
+    yield engine
+    engine.quit()
+
+
+def read_until(engine, prefix, timeout=20):
+    """Polls the engine until a line starting with `prefix`; returns (line, engine.searching at that line)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        for line in engine.poll():
+            assert line is not None, "engine exited"
+            if line.startswith(prefix):
+                return line, engine.searching
+        time.sleep(0.01)
+    raise AssertionError(f"no {prefix!r} line within {timeout} s")
+
+
+def legal_moves(fen, moves):
+    rules = ChessRules()
+    rules.set_fen(fen)
+    for text in moves:
+        rules.make_move(*parse_move(text))
+    return {move_name(fr, fc, tr, tc, rules.board[fr][fc])
+            for (fr, fc), (tr, tc) in rules.iter_valid_moves(rules.turn)}
+
+
+def test_handshake(engine):
+    read_until(engine, "uciok")
+    read_until(engine, "readyok")
+    assert engine.name == "ChessPrototype V2.0"
+
+
+def test_depth_search_returns_legal_bestmove(engine):
+    fen = ChessRules().to_fen()
+    moves = ["e2e4", "e7e5"]
+    engine.position(fen, moves)
+    engine.go(depth=2)
+    line, searching = read_until(engine, "bestmove")
+    assert searching == 0
+    assert line.split()[1] in legal_moves(fen, moves)
+
+
+def test_infinite_search_answers_stop(engine):
+    engine.position(ChessRules().to_fen(), [])
+    engine.go(infinite=True)
+    read_until(engine, "info depth 1")
+    engine.stop()
+    line, searching = read_until(engine, "bestmove")
+    assert searching == 0
+    assert line.split()[1] in legal_moves(ChessRules().to_fen(), [])
+
+
+def test_stale_bestmove_is_not_the_latest(engine):
+    fen = ChessRules().to_fen()
+    engine.position(fen, [])
+    engine.go(infinite=True)
+    read_until(engine, "info depth 1")
+    # Like ChessGUI.request_engine: stop the analysis and start a new search right away
+    engine.stop()
+    engine.position(fen, ["e2e4"])
+    engine.go(depth=1)
+    _, searching = read_until(engine, "bestmove")
+    assert searching == 1  # answer to the stopped analysis
+    line, searching = read_until(engine, "bestmove")
+    assert searching == 0
+    assert line.split()[1] in legal_moves(fen, ["e2e4"])
@@ -0,0 +1,116 @@
+"""
+Runs an external UCI engine as a child process.
+
+A reader thread collects the engine's output lines into a queue; the caller
+drains it with poll() (ChessGUI does so from a Tk after() loop), so the GUI
+never blocks on the engine. Any UCI engine works, including our own:
+
+    UCIEngine([sys.executable, "uci_frontend.py"])
+"""
+import queue
+import subprocess
+import threading
+
+
+def parse_info(line):
+    """
+    Picks the useful fields out of an "info ..." line:
+    {"depth": 12, "score": ("cp", 31), "nodes": ..., "time": ..., "pv": ["e2e4", ...]}
+    Missing fields are left out.
+    """
+    tokens = line.split()[1:]
+    info = {}
+    i = 0
+    while i < len(tokens):
+        key = tokens[i]
+        if key in ("depth", "seldepth", "nodes", "nps", "time", "multipv") and i + 1 < len(tokens):
+            info[key] = int(tokens[i + 1])
+            i += 2
+        elif key == "score" and i + 2 < len(tokens):
+            info["score"] = (tokens[i + 1], int(tokens[i + 2]))
+            i += 3
+        elif key == "pv":
+            info["pv"] = tokens[i + 1:]
+            break
+        elif key == "string":
+            info["string"] = " ".join(tokens[i + 1:])
+            break
+        else:
+            i += 1
+    return info
+
+
+class UCIEngine:
+    def __init__(self, command):
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        self.lines = queue.Queue()
+        self.name = " ".join(command) if isinstance(command, (list, tuple)) else command
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+        self.searching = 0  # "go" commands still waiting for their bestmove
+        self.send("uci")
+        self.send("isready")
+
+    def _read(self):
+        for line in self.process.stdout:
+            line = line.strip()
+            if line.startswith("id name "):
+                self.name = line[len("id name "):]
+            self.lines.put(line)
+        self.lines.put(None)  # engine exited
+
+    def send(self, command):
+        try:
+            self.process.stdin.write(command + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, ValueError):
+            pass  # engine already gone; poll() reports it
+
+    def new_game(self):
+        self.send("ucinewgame")
+
+    def position(self, fen, moves):
+        command = f"position fen {fen}"
+        if moves:
+            command += " moves " + " ".join(moves)
+        self.send(command)
+
+    def go(self, movetime_ms=None, depth=None, infinite=False, wtime=None, btime=None, winc=0, binc=0):
+        command = "go"
+        if infinite:
+            command += " infinite"
+        if movetime_ms is not None:
+            command += f" movetime {int(movetime_ms)}"
+        if depth is not None:
+            command += f" depth {depth}"
+        if wtime is not None and btime is not None:
+            command += f" wtime {int(wtime)} btime {int(btime)} winc {int(winc)} binc {int(binc)}"
+        self.searching += 1
+        self.send(command)
+
+    def stop(self):
+        if self.searching:
+            self.send("stop")
+
+    def poll(self):
+        """
+        Non-blocking: yields the lines received since the last call. `searching` is
+        updated as each bestmove is yielded, so the caller can tell whether it answers
+        the latest "go". A None entry means the engine process has exited.
+        """
+        while True:
+            try:
+                line = self.lines.get_nowait()
+            except queue.Empty:
+                return
+            if line is not None and line.startswith("bestmove"):
+                self.searching = max(0, self.searching - 1)
+            yield line
+
+    def quit(self):
+        self.send("quit")
+        try:
+            self.process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
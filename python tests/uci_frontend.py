@@ -0,0 +1,213 @@
+"""
+UCI front-end for this project's rules, so other tools (GUIs, match runners,
+or our own uci_engine.UCIEngine) can drive it over stdin/stdout.
+
+The engine behind it is deliberately small: iterative-deepening alpha-beta over
+material. It is meant as a stand-in opponent and test engine, not a strong player.
+
+    python uci_frontend.py
+"""
+import sys
+import threading
+import time
+
+from chess_rules import ChessRules, move_name, parse_move
+
+PIECE_VALUES = {"P": 100, "N": 300, "B": 300, "R": 500, "Q": 900, "K": 0}
+MATE_SCORE = 100000
+MAX_DEPTH = 64
+
+
+class SearchAborted(Exception):
+    pass
+
+
+def evaluate(rules):
+    """Material balance in centipawns from the side to move's point of view."""
+    score = 0
+    for row in rules.board:
+        for piece in row:
+            if piece:
+                value = PIECE_VALUES[piece.upper()]
+                score += value if piece.isupper() else -value
+    return score if rules.turn == "W" else -score
+
+
+def ordered_moves(rules):
+    """Valid moves with captures first, most valuable victim first."""
+    moves = list(rules.iter_valid_moves(rules.turn))
+    board = rules.board
+    moves.sort(key=lambda m: -PIECE_VALUES[board[m[1][0]][m[1][1]].upper()] if board[m[1][0]][m[1][1]] else 0)
+    return moves
+
+
+class Searcher:
+    def __init__(self, rules, deadline, stop_event):
+        self.rules = rules
+        self.deadline = deadline
+        self.stop_event = stop_event
+        self.nodes = 0
+
+    def negamax(self, rules, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.stop_event.is_set() or (self.deadline is not None and time.monotonic() > self.deadline):
+            raise SearchAborted
+        moves = ordered_moves(rules)
+        if not moves:
+            return -(MATE_SCORE - ply) if rules.is_in_check_board(rules.board, rules.turn) else 0, []
+        if depth == 0:
+            return evaluate(rules), []
+        best_pv = []
+        for (fr, fc), (tr, tc) in moves:
+            piece = rules.board[fr][fc]
+            record = rules.make_move(fr, fc, tr, tc)
+            try:
+                score, pv = self.negamax(rules, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                rules.unmake_move(record)
+            score = -score
+            if score > alpha:
+                alpha = score
+                best_pv = [move_name(fr, fc, tr, tc, piece)] + pv
+                if alpha >= beta:
+                    break
+        return alpha, best_pv
+
+
+def format_score(score):
+    if abs(score) > MATE_SCORE - MAX_DEPTH:
+        plies = MATE_SCORE - abs(score)
+        return f"mate {(plies + 1) // 2 if score > 0 else -((plies + 1) // 2)}"
+    return f"cp {score}"
+
+
+class UCIFrontend:
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.out_lock = threading.Lock()
+        self.rules = ChessRules()
+        self.stop_event = threading.Event()
+        self.search_thread = None
+        self.search_infinite = False
+
+    def send(self, line):
+        with self.out_lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def set_position(self, args):
+        rules = ChessRules()
+        if args and args[0] == "fen":
+            fen_end = args.index("moves") if "moves" in args else len(args)
+            rules.set_fen(" ".join(args[1:fen_end]))
+            args = args[fen_end:]
+        elif args and args[0] == "startpos":
+            args = args[1:]
+        if args and args[0] == "moves":
+            for text in args[1:]:
+                fr, fc, tr, tc = parse_move(text)
+                piece = rules.board[fr][fc]
+                if not piece or not rules.validate_move(piece, fr, fc, tr, tc):
+                    raise ValueError(f"illegal move in position: {text}")
+                rules.make_move(fr, fc, tr, tc)
+        self.rules = rules
+
+    def go(self, args):
+        options = {}
+        infinite = "infinite" in args
+        for i, key in enumerate(args[:-1]):
+            if key in ("depth", "movetime", "wtime", "btime", "winc", "binc"):
+                options[key] = int(args[i + 1])
+        max_depth = options.get("depth", MAX_DEPTH)
+        budget_ms = options.get("movetime")
+        side = "w" if self.rules.turn == "W" else "b"
+        if budget_ms is None and f"{side}time" in options:
+            budget_ms = options[f"{side}time"] // 30 + options.get(f"{side}inc", 0) // 2
+        if budget_ms is None and not infinite and "depth" not in options:
+            budget_ms = 1000
+        deadline = time.monotonic() + budget_ms / 1000 if budget_ms is not None and not infinite else None
+
+        self.wait_for_search()
+        self.stop_event.clear()
+        rules = self.rules.copy()
+        self.search_infinite = infinite
+        self.search_thread = threading.Thread(target=self.search, args=(rules, max_depth, deadline, infinite), daemon=True)
+        self.search_thread.start()
+
+    def search(self, rules, max_depth, deadline, infinite=False):
+        searcher = Searcher(rules, deadline, self.stop_event)
+        start = time.monotonic()
+        best = None
+        for depth in range(1, max_depth + 1):
+            try:
+                score, pv = searcher.negamax(rules, depth, -MATE_SCORE - 1, MATE_SCORE + 1, 0)
+            except SearchAborted:
+                break
+            if not pv:
+                break  # no legal moves
+            best = pv[0]
+            elapsed_ms = int((time.monotonic() - start) * 1000)
+            self.send(f"info depth {depth} score {format_score(score)} nodes {searcher.nodes} "
+                      f"time {elapsed_ms} pv {' '.join(pv)}")
+            if abs(score) > MATE_SCORE - MAX_DEPTH:
+                break
+        if infinite:
+            self.stop_event.wait()  # "go infinite" answers only after "stop"
+        if best is None:
+            # Out of time before depth 1 finished: any legal move beats none
+            first = next(rules.iter_valid_moves(rules.turn), None)
+            if first is not None:
+                (fr, fc), (tr, tc) = first
+                best = move_name(fr, fc, tr, tc, rules.board[fr][fc])
+        self.send(f"bestmove {best or '0000'}")
+
+    def wait_for_search(self, stop=False):
+        """Waits for the running search; with stop=True it is cut short first."""
+        if stop:
+            self.stop_event.set()
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+    def handle(self, line):
+        """Handles one command line. Returns False on quit."""
+        parts = line.split()
+        if not parts:
+            return True
+        command, args = parts[0], parts[1:]
+        if command == "uci":
+            self.send("id name ChessPrototype V2.0")
+            self.send("id author leonlolleonlol")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.wait_for_search(stop=True)
+            self.rules = ChessRules()
+        elif command == "position":
+            self.wait_for_search(stop=True)
+            self.set_position(args)
+        elif command == "go":
+            self.go(args)
+        elif command == "stop":
+            self.wait_for_search(stop=True)
+        elif command == "quit":
+            self.wait_for_search(stop=True)
+            return False
+        return True
+
+
+def main():
+    frontend = UCIFrontend()
+    for line in sys.stdin:
+        try:
+            if not frontend.handle(line):
+                break
+        except ValueError as e:
+            frontend.send(f"info string error: {e}")
+    # stdin closed: let a running search report its bestmove (nobody can send "stop" to an infinite one)
+    frontend.wait_for_search(stop=frontend.search_infinite)
+
+
+if __name__ == "__main__":
+    main()